@@ -0,0 +1,267 @@
+from contextlib import contextmanager
+import threading
+import numpy as np
+import sounddevice as sd
+
+
+class AudioBuffer:
+    """
+    A growable, preallocated buffer of mono audio samples.
+
+    Samples are written by the audio callback and consumed as fixed-size frames by the
+    recording loop. The underlying array only grows (by doubling), so appending is amortized
+    O(1) and the recorded audio can be handed out as a view without copying.
+    """
+
+    def __init__(self, sample_rate, initial_seconds=30, dtype=np.int16):
+        """
+        Initialize the AudioBuffer.
+
+        :param sample_rate: Sample rate of the audio in Hz
+        :param initial_seconds: Number of seconds to preallocate
+        :param dtype: Sample data type
+        """
+        self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtype)
+        self._data = np.empty(max(int(sample_rate * initial_seconds), 1), dtype=self.dtype)
+        self._length = 0
+        self._read_pos = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._length
+
+    def append(self, samples):
+        """
+        Append samples to the end of the buffer, growing it if necessary.
+
+        :param samples: 1-D array of samples
+        """
+        count = len(samples)
+        with self._lock:
+            end = self._length + count
+            if end > len(self._data):
+                capacity = len(self._data)
+                while capacity < end:
+                    capacity *= 2
+                data = np.empty(capacity, dtype=self.dtype)
+                data[:self._length] = self._data[:self._length]
+                self._data = data
+            self._data[self._length:end] = samples
+            self._length = end
+
+    def available(self):
+        """Return the number of samples written but not yet consumed as frames."""
+        return self._length - self._read_pos
+
+    def read_frames(self, frame_size):
+        """
+        Consume every complete frame that is currently available.
+
+        Several callback blocks may have arrived since the last call, so this returns all of
+        them at once; a trailing partial frame is left for the next call.
+
+        :param frame_size: Number of samples per frame
+        :return: 2-D view into the buffer with one exactly frame_size long frame per row
+        """
+        with self._lock:
+            data = self._data
+            count = (self._length - self._read_pos) // frame_size
+            start = self._read_pos
+            self._read_pos += count * frame_size
+        return data[start:start + count * frame_size].reshape(count, frame_size)
+
+    def view(self, start=0, end=None):
+        """
+        Return a zero-copy view of the recorded samples.
+
+        The view stays valid after later appends, but will not reflect samples written after
+        the buffer had to grow.
+
+        :param start: Index of the first sample
+        :param end: Index one past the last sample, defaults to the end of the recording
+        :return: numpy array view
+        """
+        with self._lock:
+            length = self._length
+            data = self._data
+        end = length if end is None else min(end, length)
+        return data[start:end]
+
+
+class RingBuffer:
+    """
+    A fixed-size ring buffer that keeps only the most recent samples.
+    """
+
+    def __init__(self, size, dtype=np.int16):
+        """
+        Initialize the RingBuffer.
+
+        :param size: Maximum number of samples to keep
+        :param dtype: Sample data type
+        """
+        self._data = np.zeros(size, dtype=dtype)
+        self._write_pos = 0
+        self._filled = 0
+
+    def write(self, samples):
+        """
+        Write samples, overwriting the oldest ones once the buffer is full.
+
+        :param samples: 1-D array of samples
+        """
+        size = len(self._data)
+        if size == 0:
+            return
+        if len(samples) >= size:
+            self._data[:] = samples[-size:]
+            self._write_pos = 0
+            self._filled = size
+            return
+        end = self._write_pos + len(samples)
+        if end <= size:
+            self._data[self._write_pos:end] = samples
+        else:
+            split = size - self._write_pos
+            self._data[self._write_pos:] = samples[:split]
+            self._data[:end - size] = samples[split:]
+        self._write_pos = end % size
+        self._filled = min(self._filled + len(samples), size)
+
+    def read(self):
+        """Return the buffered samples in chronological order."""
+        if self._filled < len(self._data):
+            return self._data[:self._filled]
+        return np.concatenate((self._data[self._write_pos:], self._data[:self._write_pos]))
+
+    def clear(self):
+        """Discard all buffered samples."""
+        self._write_pos = 0
+        self._filled = 0
+
+
+class AudioCaptureService:
+    """
+    Keeps a single input stream open across recordings.
+
+    While idle, incoming audio only goes into a bounded pre-roll ring buffer. When a recording
+    starts, the pre-roll is spliced onto the start of the recording buffer and the stream
+    feeds that buffer directly, so activation neither pays for opening a stream nor clips
+    the first syllable.
+    """
+
+    def __init__(self, sample_rate, device=None, blocksize=None, pre_roll_ms=500, dtype=np.int16):
+        """
+        Initialize the AudioCaptureService.
+
+        :param sample_rate: Sample rate in Hz
+        :param device: Sound device to record from, or None for the default device
+        :param blocksize: Number of frames per callback block
+        :param pre_roll_ms: Length of the pre-roll buffer in milliseconds
+        :param dtype: Sample data type
+        """
+        self.sample_rate = sample_rate
+        self.device = device
+        self.blocksize = blocksize or int(sample_rate * 0.03)
+        self.dtype = np.dtype(dtype)
+        self.pre_roll = RingBuffer(int(sample_rate * pre_roll_ms / 1000), dtype=self.dtype)
+        self.stream = None
+        self._sink = None
+        self._data_ready = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Open the input stream and start filling the pre-roll buffer."""
+        if self.stream:
+            return
+        self.stream = sd.InputStream(samplerate=self.sample_rate, channels=1, dtype=self.dtype.name,
+                                     blocksize=self.blocksize, device=self.device,
+                                     callback=self._audio_callback)
+        self.stream.start()
+
+    def stop(self):
+        """Stop and close the input stream."""
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def is_active(self):
+        """Return True if the input stream is running."""
+        return self.stream is not None and self.stream.active
+
+    def _audio_callback(self, indata, frames, time, status):
+        with self._lock:
+            if self._sink is not None:
+                self._sink.append(indata[:, 0])
+                self._data_ready.set()
+            else:
+                self.pre_roll.write(indata[:, 0])
+
+    def attach(self, audio_buffer, data_ready):
+        """
+        Start routing audio into a recording buffer, beginning with the pre-roll.
+
+        :param audio_buffer: AudioBuffer that receives the recording
+        :param data_ready: Event set whenever new audio has been appended
+        """
+        with self._lock:
+            audio_buffer.append(self.pre_roll.read())
+            self.pre_roll.clear()
+            self._sink = audio_buffer
+            self._data_ready = data_ready
+        data_ready.set()
+
+    def detach(self):
+        """Stop routing audio into the recording buffer and go back to filling the pre-roll."""
+        with self._lock:
+            self._sink = None
+            self._data_ready = None
+
+    def handover(self, audio_buffer, carry_from):
+        """
+        Atomically switch recording to a new buffer without dropping any audio.
+
+        Samples of the current buffer from carry_from onwards (audio that arrived after the
+        end of the previous utterance) are moved to the start of the new buffer.
+
+        :param audio_buffer: AudioBuffer that receives the recording from now on
+        :param carry_from: Index in the current buffer where the new buffer should start
+        """
+        with self._lock:
+            if self._sink is not None:
+                audio_buffer.append(self._sink.view(start=carry_from))
+            self._sink = audio_buffer
+
+    @contextmanager
+    def recording(self, audio_buffer, data_ready):
+        """
+        Context manager that attaches a recording buffer for the duration of the block.
+
+        :param audio_buffer: AudioBuffer that receives the recording
+        :param data_ready: Event set whenever new audio has been appended
+        """
+        self.attach(audio_buffer, data_ready)
+        try:
+            yield self
+        finally:
+            self.detach()
+
+
+class Recording:
+    """
+    A finished utterance, ready to be transcribed.
+    """
+
+    def __init__(self, audio, offset=0, speech_flags=None):
+        """
+        Initialize the Recording.
+
+        :param audio: numpy array view of the utterance audio
+        :param offset: Index of the first sample of audio in the capture buffer
+        :param speech_flags: Per-frame VAD decisions aligned with audio, or None if VAD did not run
+        """
+        self.audio = audio
+        self.offset = offset
+        self.speech_flags = speech_flags
@@ -0,0 +1,81 @@
+import threading
+
+from utils import ConfigManager
+
+
+def needs_second_pass(segments, thresholds):
+    """
+    Decide whether a transcription is uncertain enough to be decoded again by a larger model.
+
+    :param segments: Decoded segments with avg_logprob, no_speech_prob and compression_ratio
+    :param thresholds: dict with 'logprob', 'no_speech' and 'compression_ratio' thresholds
+    :return: description of the first threshold that was crossed, or None
+    """
+    for segment in segments:
+        avg_logprob = getattr(segment, 'avg_logprob', None)
+        if avg_logprob is not None and avg_logprob < thresholds['logprob']:
+            return f'avg_logprob {avg_logprob:.2f}'
+        no_speech_prob = getattr(segment, 'no_speech_prob', None)
+        if no_speech_prob is not None and no_speech_prob > thresholds['no_speech']:
+            return f'no_speech_prob {no_speech_prob:.2f}'
+        compression_ratio = getattr(segment, 'compression_ratio', None)
+        if compression_ratio is not None and compression_ratio > thresholds['compression_ratio']:
+            return f'compression_ratio {compression_ratio:.2f}'
+    return None
+
+
+class CascadeModel:
+    """
+    Two models used in place of one: a small, fast model transcribes everything, and only
+    transcriptions it is unsure about are decoded again by a larger, more accurate model.
+
+    The accurate model is either passed in already loaded, or loaded on a background thread
+    so the fast model can serve requests in the meantime. Until it is ready, the fast model's
+    transcription is used as is.
+    """
+
+    def __init__(self, fast_model, accurate_model=None, accurate_loader=None):
+        """
+        Initialize the CascadeModel.
+
+        :param fast_model: Loaded faster-whisper model used for the first pass
+        :param accurate_model: Loaded faster-whisper model used for the second pass
+        :param accurate_loader: Function that loads the accurate model, called on a background
+                                thread if accurate_model is not given
+        """
+        self.fast_model = fast_model
+        self.accurate_model = accurate_model
+        if accurate_model is None and accurate_loader is not None:
+            threading.Thread(target=self._load_accurate_model, args=(accurate_loader,), daemon=True).start()
+
+    def _load_accurate_model(self, loader):
+        try:
+            self.accurate_model = loader()
+        except Exception as e:
+            ConfigManager.console_print(f'Could not load the cascade model, using only the fast model: {e}')
+
+    def transcribe(self, audio, cascade_thresholds=None, **options):
+        """
+        Transcribe audio like WhisperModel.transcribe, with a second pass for uncertain results.
+
+        :param audio: float32 numpy array
+        :param cascade_thresholds: dict with 'logprob', 'no_speech' and 'compression_ratio'
+                                   thresholds, or None to only run the fast model
+        :param options: Keyword arguments for WhisperModel.transcribe
+        :return: (list of segments, info)
+        """
+        segments, info = self.fast_model.transcribe(audio=audio, **options)
+        segments = list(segments)
+        if not cascade_thresholds:
+            return segments, info
+
+        reason = needs_second_pass(segments, cascade_thresholds)
+        if reason is None:
+            return segments, info
+        if self.accurate_model is None:
+            ConfigManager.console_print(f'Low confidence ({reason}), but the cascade model is not loaded yet.')
+            return segments, info
+
+        ConfigManager.console_print(f'Low confidence ({reason}), decoding again with the cascade model.')
+        segments, info = self.accurate_model.transcribe(audio=audio, **options)
+        return list(segments), info
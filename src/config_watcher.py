@@ -0,0 +1,148 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+from utils import ConfigManager
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class ConfigWatcher:
+    """
+    Watch the configuration file and call a function whenever it has been written.
+
+    On Linux, the directory containing the file is watched with inotify, which also notices
+    editors and deployment tools that replace the file instead of writing it in place. Elsewhere,
+    or if inotify is unavailable, the file's modification time and size are polled.
+
+    Writes are debounced: the function is called once the file has not changed for a short while,
+    so a file written in several steps is only reloaded once.
+    """
+
+    def __init__(self, path, on_change, poll_interval=1.0, debounce=0.2):
+        """
+        Initialize the ConfigWatcher.
+
+        :param path: Path of the configuration file
+        :param on_change: Function called without arguments on the watcher thread after the file changed
+        :param poll_interval: Seconds between checks when polling
+        :param debounce: Seconds without further changes before on_change is called
+        """
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        """Start watching on a background thread."""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop watching."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def _run(self):
+        inotify_fd = self._init_inotify()
+        if inotify_fd is None:
+            self._poll()
+            return
+        try:
+            self._watch_inotify(inotify_fd)
+        finally:
+            os.close(inotify_fd)
+
+    def _notify(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            ConfigManager.console_print(f'Error while applying the changed configuration: {e}')
+
+    def _init_inotify(self):
+        """
+        Create an inotify instance watching the directory of the configuration file.
+
+        :return: inotify file descriptor, or None if inotify is not available
+        """
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            directory = os.path.dirname(self.path).encode()
+            if libc.inotify_add_watch(fd, directory, IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _read_events(self, fd):
+        """Return True if the pending inotify events include a write to the configuration file."""
+        try:
+            data = os.read(fd, 4096)
+        except BlockingIOError:
+            return False
+        file_name = os.path.basename(self.path).encode()
+        changed = False
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, _, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+            changed = changed or name == file_name
+        return changed
+
+    def _watch_inotify(self, fd):
+        pending = False
+        while not self.stop_event.is_set():
+            # Wake up regularly to notice stop(), and after the debounce delay once a change is pending
+            ready, _, _ = select.select([fd], [], [], self.debounce if pending else self.poll_interval)
+            if ready:
+                pending = self._read_events(fd) or pending
+            elif pending:
+                pending = False
+                self._notify()
+
+    def _file_state(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _poll(self):
+        last_state = self._file_state()
+        while not self.stop_event.wait(self.poll_interval):
+            state = self._file_state()
+            if state == last_state:
+                continue
+            # Wait until the file has stopped changing
+            while not self.stop_event.wait(self.debounce):
+                settled_state = self._file_state()
+                if settled_state == state:
+                    break
+                state = settled_state
+            last_state = state
+            if state is not None and not self.stop_event.is_set():
+                self._notify()
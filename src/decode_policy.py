@@ -0,0 +1,109 @@
+import threading
+
+
+class DecodePolicy:
+    """
+    Chooses decode options for each recording so that its transcription fits a latency budget.
+
+    The policy keeps an exponential moving average of the real-time factor (decode seconds per
+    second of audio) measured for each model and beam size. Short commands are always decoded
+    greedily, since a wider beam gains little on a few words. For longer dictations it picks the
+    widest beam, up to the configured one, whose estimated time until text appears fits the
+    budget. When text is typed as each window is decoded, only the first window has to fit, so
+    long dictations can afford beam search.
+    """
+
+    # Weight of the newest measurement in the moving average
+    smoothing = 0.3
+    # Assumed slowdown per additional beam relative to greedy decoding, until measured
+    beam_cost = 0.2
+    # Real-time factor of greedy decoding assumed before anything has been measured
+    initial_rtf = 0.3
+    # Recordings up to this many seconds fit in one decoding window and can skip timestamps
+    single_window_seconds = 30
+    # Recordings up to this many seconds are short commands
+    short_command_seconds = 5
+
+    def __init__(self):
+        """
+        Initialize the DecodePolicy.
+        """
+        self.rtf = {}
+        self.lock = threading.Lock()
+
+    def estimate_rtf(self, model_key, beam_size):
+        """
+        Estimate the real-time factor of decoding with the given model and beam size.
+
+        :param model_key: Hashable identifier of the loaded model
+        :param beam_size: Beam size
+        :return: estimated decode seconds per second of audio
+        """
+        with self.lock:
+            if (model_key, beam_size) in self.rtf:
+                return self.rtf[(model_key, beam_size)]
+            # Extrapolate from the closest measured beam size
+            measured = [(abs(beam - beam_size), beam, rtf) for (key, beam), rtf in self.rtf.items() if key == model_key]
+        if measured:
+            _, beam, rtf = min(measured)
+        else:
+            beam, rtf = 1, self.initial_rtf
+        return rtf * (1 + self.beam_cost * (beam_size - 1)) / (1 + self.beam_cost * (beam - 1))
+
+    def choose(self, model_key, duration, latency_budget, options, incremental=False):
+        """
+        Adapt decode options to a recording.
+
+        :param model_key: Hashable identifier of the loaded model
+        :param duration: Length in seconds of the audio decoded by one model call
+        :param latency_budget: Seconds within which text should start to appear
+        :param options: Configured keyword arguments for WhisperModel.transcribe
+        :param incremental: True if text is output as soon as each window is decoded
+        :return: new options dict with beam_size, temperature and without_timestamps chosen
+        """
+        if incremental:
+            duration_until_output = min(duration, self.single_window_seconds)
+        else:
+            duration_until_output = duration
+
+        max_beam = max(options.get('beam_size') or 1, 1)
+        beam_size = 1
+        if duration > self.short_command_seconds:
+            for candidate in range(max_beam, 0, -1):
+                if duration_until_output * self.estimate_rtf(model_key, candidate) <= latency_budget:
+                    beam_size = candidate
+                    break
+
+        options = dict(options)
+        options['beam_size'] = beam_size
+
+        # Temperature fallback re-decodes windows that look like failures, which can multiply
+        # the decode time; only allow it when even the worst case fits in the budget
+        temperature = options.get('temperature') or 0.0
+        if isinstance(temperature, (int, float)):
+            fallback = [round(temperature + step * 0.2, 1) for step in range(6) if temperature + step * 0.2 <= 1.0]
+            worst_case = duration_until_output * self.estimate_rtf(model_key, beam_size) * len(fallback)
+            short_command = duration <= self.short_command_seconds
+            options['temperature'] = fallback if worst_case <= latency_budget and not short_command else temperature
+
+        # Predicting timestamp tokens costs decoding steps that a single window doesn't need
+        options['without_timestamps'] = duration <= self.single_window_seconds
+        return options
+
+    def record(self, model_key, beam_size, duration, elapsed):
+        """
+        Record how long a decode took.
+
+        :param model_key: Hashable identifier of the loaded model
+        :param beam_size: Beam size used
+        :param duration: Length in seconds of the decoded audio
+        :param elapsed: Seconds the decode took
+        """
+        if duration <= 0:
+            return
+        rtf = elapsed / duration
+        with self.lock:
+            previous = self.rtf.get((model_key, beam_size))
+            if previous is not None:
+                rtf = previous + self.smoothing * (rtf - previous)
+            self.rtf[(model_key, beam_size)] = rtf
@@ -0,0 +1,446 @@
+"""
+Out-of-process inference server for the local Whisper model.
+
+The server owns the faster-whisper model in its own process, so the model stays loaded while
+the UI process restarts or applies settings, and CTranslate2 never shares a process with Qt.
+Requests arrive over an authenticated local connection; audio is passed as int16 or float32
+samples in shared memory.
+
+Run directly to start a server: python src/inference_server.py
+"""
+import os
+import secrets
+import stat
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+from types import SimpleNamespace
+
+import numpy as np
+
+from cascade_model import CascadeModel
+from model_manager import ModelManager
+from utils import ConfigManager
+
+KEY_FILE = os.path.join('src', '.inference_server_key')
+SEGMENT_FIELDS = ('id', 'start', 'end', 'text', 'avg_logprob', 'no_speech_prob', 'compression_ratio')
+INFO_FIELDS = ('language', 'language_probability', 'duration')
+
+
+def load_authkey():
+    """
+    Load the key used to authenticate with the inference server, creating it if needed.
+
+    :return: authentication key as bytes
+    """
+    if not os.path.isfile(KEY_FILE):
+        with open(KEY_FILE, 'w', encoding='utf-8') as file:
+            file.write(secrets.token_hex(32))
+        # Set restrictive file permissions (owner read/write only)
+        try:
+            os.chmod(KEY_FILE, stat.S_IRUSR | stat.S_IWUSR)
+        except OSError:
+            pass  # Windows ACLs may not fully support this
+    with open(KEY_FILE, 'r', encoding='utf-8') as file:
+        return file.read().strip().encode('utf-8')
+
+
+class InferenceServer:
+    """
+    Serves transcription requests, replacing the model without downtime when asked to load a new one.
+    """
+
+    def __init__(self, port):
+        """
+        Initialize the InferenceServer.
+
+        :param port: Local TCP port to listen on
+        """
+        self.port = port
+        self.models = ModelManager(self._create_model)
+        self.shm_lock = threading.Lock()
+        self.shared_memory = {}
+        self.running = True
+        self.authkey = load_authkey()
+
+    def serve_forever(self):
+        """Accept connections until a shutdown request is received."""
+        # Clients are authenticated on their own thread, not by the listener, so a client with the
+        # wrong key or one that never answers cannot stop or hold up the server
+        with Listener(('127.0.0.1', self.port)) as listener:
+            ConfigManager.console_print(f'Inference server listening on port {self.port}.')
+            while self.running:
+                try:
+                    connection = listener.accept()
+                except OSError:
+                    continue
+                if not self.running:
+                    connection.close()
+                    break
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+    def _serve_connection(self, connection):
+        """Authenticate one client and handle its requests until it disconnects."""
+        with connection:
+            try:
+                deliver_challenge(connection, self.authkey)
+                answer_challenge(connection, self.authkey)
+            except (AuthenticationError, EOFError, OSError) as e:
+                ConfigManager.console_print(f'Rejected inference server client: {type(e).__name__}: {e}')
+                return
+
+            while self.running:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                if request.get('command') == 'transcribe' and request.get('stream'):
+                    try:
+                        self._stream_transcription(connection, request)
+                    except (EOFError, OSError):
+                        return
+                    continue
+                try:
+                    response = {'ok': True, 'result': self._handle(request)}
+                except Exception as e:
+                    response = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+                connection.send(response)
+
+                if not self.running:
+                    # Wake up accept() so serve_forever notices the shutdown
+                    Client(('127.0.0.1', self.port)).close()
+                    return
+
+    def _handle(self, request):
+        """Dispatch a single request."""
+        command = request['command']
+        if command == 'ping':
+            return {'pid': os.getpid(), 'model_options': self.models.options}
+        if command == 'load':
+            return self.models.request(request['model_options'])
+        if command == 'status':
+            return self._status()
+        if command == 'wait':
+            self.models.wait_until_settled(request.get('timeout'))
+            return self._status()
+        if command == 'transcribe':
+            return self._transcribe(request)
+        if command == 'shutdown':
+            self.running = False
+            return None
+        raise ValueError(f'Unknown command: {command}')
+
+    @staticmethod
+    def _create_model(model_options):
+        """Load a model for the given local model options."""
+        from transcription import create_local_model
+
+        # Outside of Qt, a cascade model can be loaded while the fast model already serves requests
+        return create_local_model(model_options, background_cascade=True)
+
+    def _status(self):
+        """Return the model status reported to clients."""
+        return {'status': self.models.status, 'error': self.models.error, 'model_options': self.models.options}
+
+    def _attach(self, name):
+        """Attach to a client's shared memory block, reusing the handle for later requests."""
+        block = self.shared_memory.get(name)
+        if block is None:
+            for old_block in self.shared_memory.values():
+                old_block.close()
+            self.shared_memory.clear()
+            block = shared_memory.SharedMemory(name=name)
+            self.shared_memory[name] = block
+        return block
+
+    def _prepare_transcription(self, request):
+        """
+        Get the model and a private float32 copy of the audio for a transcribe request.
+
+        :return: (model, float32 audio, keyword arguments for the model's transcribe)
+        """
+        from transcription import to_float32
+
+        # While a new model is loading, the previous one keeps serving requests
+        model = self.models.wait()
+        if model is None:
+            raise RuntimeError(f'No model loaded: {self.models.error}')
+
+        options = dict(request['options'])
+        if not isinstance(model, CascadeModel):
+            # The model loaded before a cascade model was configured may still be serving
+            options.pop('cascade_thresholds', None)
+
+        with self.shm_lock:
+            block = self._attach(request['shm_name'])
+            audio = np.ndarray((request['length'],), dtype=request.get('dtype', 'int16'), buffer=block.buf)
+            # Copy out of the shared block, which the client reuses for the next request
+            audio_float = to_float32(audio)
+            if audio_float is audio:
+                audio_float = audio.copy()
+            del audio
+        return model, audio_float, options
+
+    def _transcribe(self, request):
+        """Transcribe audio from shared memory and return plain segment and info dicts."""
+        from transcription import decode_chunks
+
+        model, audio_float, options = self._prepare_transcription(request)
+        if request.get('chunks'):
+            chunk_segments = list(decode_chunks(model, audio_float, request['chunks'], request['max_workers'],
+                                                **options))
+            return {'chunks': [[self._segment_dict(segment) for segment in segments]
+                               for segments in chunk_segments]}
+
+        segments, info = model.transcribe(audio=audio_float, **options)
+        segments = [self._segment_dict(segment) for segment in segments]
+        info = {field: getattr(info, field, None) for field in INFO_FIELDS}
+        return {'segments': segments, 'info': info}
+
+    def _stream_transcription(self, connection, request):
+        """
+        Transcribe audio from shared memory, sending each segment to the client as soon as it is
+        decoded, followed by a message without a segment that ends the stream.
+        """
+        try:
+            model, audio_float, options = self._prepare_transcription(request)
+            segments, _ = model.transcribe(audio=audio_float, **options)
+            for segment in segments:
+                connection.send({'ok': True, 'segment': self._segment_dict(segment)})
+            connection.send({'ok': True, 'result': None})
+        except (EOFError, OSError):
+            raise
+        except Exception as e:
+            connection.send({'ok': False, 'error': f'{type(e).__name__}: {e}'})
+
+    @staticmethod
+    def _segment_dict(segment):
+        """Convert a segment to a plain dict that can be sent to the client."""
+        return {field: getattr(segment, field, None) for field in SEGMENT_FIELDS}
+
+
+class RemoteWhisperModel:
+    """
+    Client for the inference server that can be used in place of a faster-whisper WhisperModel.
+
+    transcribe() returns (segments, info) like WhisperModel.transcribe, with the segments
+    already decoded, and iter_transcribe() yields the segments as the server decodes them. Audio is
+    sent as is (int16 or float32) through a shared memory block that is reused across requests and
+    only reallocated when a longer recording arrives.
+    """
+
+    accepts_int16 = True
+
+    def __init__(self, port, timeout=30):
+        """
+        Initialize the RemoteWhisperModel, starting the server if it is not running.
+
+        :param port: Local TCP port of the server
+        :param timeout: Seconds to wait for a newly started server to accept connections
+        """
+        self.port = port
+        self.timeout = timeout
+        self.lock = threading.RLock()
+        self.shm = None
+        self.connection = None
+        try:
+            self.connection = self._connect(timeout)
+        except ConnectionError as e:
+            # Not fatal: the next request tries to connect again
+            ConfigManager.console_print(f'Could not connect to inference server: {e}')
+
+    def _connect(self, timeout):
+        """Connect to the server, starting it first if nothing is listening."""
+        address = ('127.0.0.1', self.port)
+        authkey = load_authkey()
+        try:
+            return Client(address, authkey=authkey)
+        except ConnectionRefusedError:
+            pass
+        except AuthenticationError as e:
+            raise ConnectionError(f'The server on port {self.port} rejected the key in {KEY_FILE}. It may belong to '
+                                  f'another user or have been started before the key was regenerated.') from e
+
+        ConfigManager.console_print('Starting inference server...')
+        self._spawn_server()
+        deadline = time.time() + timeout
+        while True:
+            try:
+                return Client(address, authkey=authkey)
+            except ConnectionRefusedError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def _spawn_server(self):
+        """Start the server as a detached process so it outlives this one."""
+        command = [sys.executable, os.path.abspath(__file__), '--port', str(self.port)]
+        if sys.platform == 'win32':
+            subprocess.Popen(command, cwd=os.getcwd(),
+                             creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP)
+        else:
+            subprocess.Popen(command, cwd=os.getcwd(), start_new_session=True,
+                             stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def _request(self, request, receive=True):
+        """
+        Send a request and return its result, raising if the server reported an error.
+
+        :param receive: Wait for the response; if False, the caller reads it with the lock held
+        """
+        with self.lock:
+            if self.connection is None:
+                self.connection = self._connect(self.timeout)
+            self.connection.send(request)
+            if not receive:
+                return None
+            response = self.connection.recv()
+        if not response['ok']:
+            raise RuntimeError(f"Inference server error: {response['error']}")
+        return response['result']
+
+    def load(self, model_options):
+        """
+        Make the server serve a model for the given options. The model is loaded in the
+        background while the previous one keeps serving requests.
+
+        :param model_options: Local model options (model_options.local)
+        :return: True if the server started loading a new model, False if it is already loaded
+        """
+        return self._request({'command': 'load', 'model_options': dict(model_options)})
+
+    def status(self):
+        """
+        Return the server's model status.
+
+        :return: dict with 'status' ('loading', 'ready' or 'error'), 'error' and 'model_options'
+        """
+        return self._request({'command': 'status'})
+
+    def wait_until_loaded(self, timeout=None):
+        """
+        Block until the server has finished loading the requested model.
+
+        Uses its own connection, so it can be called from another thread without holding up
+        transcription requests.
+
+        :param timeout: Maximum number of seconds to wait, or None to wait indefinitely
+        :return: status dict as returned by status()
+        """
+        with Client(('127.0.0.1', self.port), authkey=load_authkey()) as connection:
+            connection.send({'command': 'wait', 'timeout': timeout})
+            response = connection.recv()
+        if not response['ok']:
+            raise RuntimeError(f"Inference server error: {response['error']}")
+        return response['result']
+
+    def transcribe(self, audio, **options):
+        """
+        Transcribe audio with the server's model.
+
+        :param audio: int16 or float32 numpy array
+        :param options: Keyword arguments for WhisperModel.transcribe
+        :return: (list of segments, info)
+        """
+        result = self._transcribe_request(audio, {'options': options})
+        segments = [SimpleNamespace(**segment) for segment in result['segments']]
+        return segments, SimpleNamespace(**result['info'])
+
+    def iter_transcribe(self, audio, **options):
+        """
+        Transcribe audio with the server's model, yielding each segment as soon as it is decoded.
+        The connection is held until the generator is exhausted or closed.
+
+        :param audio: int16 or float32 numpy array
+        :param options: Keyword arguments for WhisperModel.transcribe
+        :return: generator of segments
+        """
+        with self.lock:
+            self._request({'command': 'transcribe', 'stream': True, **self._share_audio(audio),
+                           'options': options}, receive=False)
+            finished = False
+            try:
+                while True:
+                    response = self.connection.recv()
+                    if not response['ok']:
+                        finished = True
+                        raise RuntimeError(f"Inference server error: {response['error']}")
+                    if 'segment' not in response:
+                        finished = True
+                        return
+                    yield SimpleNamespace(**response['segment'])
+            finally:
+                # If the caller stopped early, read the rest so the connection is ready for the next request
+                while not finished:
+                    response = self.connection.recv()
+                    finished = not response['ok'] or 'segment' not in response
+
+    def transcribe_chunks(self, audio, chunks, max_workers, **options):
+        """
+        Transcribe chunks of audio in parallel on the server's model workers.
+
+        :param audio: int16 or float32 numpy array
+        :param chunks: list of (start, end) sample indices
+        :param max_workers: Number of chunks to decode at the same time
+        :param options: Keyword arguments for WhisperModel.transcribe
+        :return: list with the list of segments of each chunk, in order
+        """
+        result = self._transcribe_request(audio, {'options': options, 'chunks': list(chunks),
+                                                  'max_workers': max_workers})
+        return [[SimpleNamespace(**segment) for segment in segments] for segments in result['chunks']]
+
+    def _share_audio(self, audio):
+        """
+        Copy audio into the shared memory block. Must be called with the lock held.
+
+        :return: request fields that describe the audio
+        """
+        if self.shm is None or self.shm.size < audio.nbytes:
+            self._release_shm()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes * 2, 1 << 20))
+        np.ndarray(audio.shape, dtype=audio.dtype, buffer=self.shm.buf)[:] = audio
+        return {'shm_name': self.shm.name, 'length': len(audio), 'dtype': audio.dtype.str}
+
+    def _transcribe_request(self, audio, request):
+        """Copy audio into the shared memory block and send a transcribe request for it."""
+        with self.lock:
+            return self._request({'command': 'transcribe', **self._share_audio(audio), **request})
+
+    def _release_shm(self):
+        """Free the shared memory block."""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self, shutdown=False):
+        """
+        Disconnect from the server.
+
+        :param shutdown: Also stop the server process and unload its model
+        """
+        try:
+            if self.connection is not None:
+                if shutdown:
+                    self._request({'command': 'shutdown'})
+                self.connection.close()
+        except (EOFError, OSError):
+            pass
+        with self.lock:
+            self._release_shm()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='WhisperWriter inference server')
+    parser.add_argument('--port', type=int, default=None)
+    args = parser.parse_args()
+
+    ConfigManager.initialize()
+    port = args.port or ConfigManager.get_config_value('model_options', 'local', 'inference_server_port') or 50765
+    InferenceServer(port).serve_forever()
@@ -2,8 +2,11 @@ import subprocess
 import os
 import re
 import signal
+import socket
+import struct
+import sys
 import time
-from pynput.keyboard import Controller as PynputController
+from pynput.keyboard import Controller as PynputController, Key
 
 from utils import ConfigManager
 
@@ -17,33 +20,159 @@ def sanitize_text_for_subprocess(text):
     return text
 
 
-def run_command_or_exit_on_failure(command):
+def run_command(command):
     """
-    Run a shell command and exit if it fails.
+    Run a command and report whether it succeeded.
 
     Args:
         command (list): The command to run as a list of strings.
+
+    Returns:
+        bool: True if the command ran and exited successfully.
     """
     try:
         subprocess.run(command, check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command: {e}")
-        exit(1)
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
+        ConfigManager.console_print(f"Error running command: {e}")
+        return False
+
+
+# Event types and key codes from <linux/input-event-codes.h>
+EV_SYN = 0
+EV_KEY = 1
+SYN_REPORT = 0
+KEY_LEFTSHIFT = 42
+# struct input_event: struct timeval, __u16 type, __u16 code, __s32 value
+INPUT_EVENT = struct.Struct('llHHi')
+
+
+def _us_keymap():
+    """Map characters to (key code, shift) on a US keyboard layout, like `ydotool type` does."""
+    keymap = {' ': (57, False), '\t': (15, False)}
+    rows = [('1234567890-=', '!@#$%^&*()_+', 2),
+            ('qwertyuiop[]', 'QWERTYUIOP{}', 16),
+            ("asdfghjkl;'`", 'ASDFGHJKL:"~', 30),
+            ('\\zxcvbnm,./', '|ZXCVBNM<>?', 43)]
+    for plain, shifted, first_code in rows:
+        for offset, char in enumerate(plain):
+            keymap[char] = (first_code + offset, False)
+        for offset, char in enumerate(shifted):
+            keymap[char] = (first_code + offset, True)
+    return keymap
+
+
+US_KEYMAP = _us_keymap()
+
+
+class YdotoolWriter:
+    """
+    Types text by sending key events straight to the ydotoold daemon over its socket, instead of
+    starting a `ydotool type` process for every transcription.
+
+    The socket is opened once and reopened if ydotoold was restarted. Like `ydotool type`, only
+    characters of the US keyboard layout can be typed; other characters are skipped.
+    """
+
+    def __init__(self, socket_path=None):
+        """
+        Initialize the YdotoolWriter.
+
+        Args:
+            socket_path (str): Path of the ydotoold socket, defaults to $YDOTOOL_SOCKET or /tmp/.ydotool_socket.
+        """
+        self.socket_path = socket_path or os.environ.get('YDOTOOL_SOCKET') or '/tmp/.ydotool_socket'
+        self.socket = None
+
+    def _connect(self):
+        self.close()
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            self.socket.connect(self.socket_path)
+        except OSError:
+            self.close()
+            raise
+
+    def _send(self, events):
+        """Send encoded events, reconnecting once if the daemon went away."""
+        sent = 0
+        reconnected = False
+        while sent < len(events):
+            try:
+                if self.socket is None:
+                    self._connect()
+                    reconnected = True
+                self.socket.send(events[sent])
+                sent += 1
+            except OSError:
+                self.close()
+                if reconnected:
+                    raise
+                reconnected = True
+                self._connect()
+
+    @staticmethod
+    def _key_events(code, shift):
+        """Encode the events for one key press and release, holding shift if needed."""
+        def event(event_type, event_code, value):
+            return INPUT_EVENT.pack(0, 0, event_type, event_code, value)
+
+        sync = event(EV_SYN, SYN_REPORT, 0)
+        events = [event(EV_KEY, code, 1), sync, event(EV_KEY, code, 0), sync]
+        if shift:
+            events = [event(EV_KEY, KEY_LEFTSHIFT, 1), sync] + events + [event(EV_KEY, KEY_LEFTSHIFT, 0), sync]
+        return events
+
+    def type(self, text, interval=0, should_stop=None):
+        """
+        Type text.
+
+        Args:
+            text (str): The text to type.
+            interval (float): The interval between keystrokes in seconds.
+            should_stop (callable): Optional function returning True if typing should stop early.
+
+        Raises:
+            OSError: If ydotoold cannot be reached.
+        """
+        keys = [US_KEYMAP[char] for char in text if char in US_KEYMAP]
+        if not interval:
+            # Without a delay, all events are sent in one batch
+            keys = [[event for code, shift in keys for event in self._key_events(code, shift)]]
+        for key in keys:
+            if should_stop and should_stop():
+                return
+            self._send(key if not interval else self._key_events(*key))
+            if interval:
+                time.sleep(interval)
+
+    def close(self):
+        """Close the socket."""
+        if self.socket:
+            self.socket.close()
+            self.socket = None
 
 class InputSimulator:
     """
     A class to simulate keyboard input using various methods.
     """
 
+    # Seconds to wait after the paste chord before restoring the clipboard, since the target
+    # application reads the clipboard only when it handles the key event
+    clipboard_restore_delay = 0.15
+
     def __init__(self):
         """
         Initialize the InputSimulator with the specified configuration.
         """
-        self.input_method = ConfigManager.get_config_value('post_processing', 'input_method')
+        self.input_method = ConfigManager.snapshot().post_processing.input_method
         self.dotool_process = None
+        self.ydotool = None
 
-        if self.input_method == 'pynput':
+        if self.input_method in ('pynput', 'clipboard'):
             self.keyboard = PynputController()
+        elif self.input_method == 'ydotool':
+            self.ydotool = YdotoolWriter()
         elif self.input_method == 'dotool':
             self._initialize_dotool()
 
@@ -62,45 +191,89 @@ class InputSimulator:
             os.kill(self.dotool_process.pid, signal.SIGINT)
             self.dotool_process = None
 
-    def typewrite(self, text):
+    def typewrite(self, text, should_stop=None):
         """
         Simulate typing the given text with the specified interval between keystrokes.
 
         Args:
             text (str): The text to type.
+            should_stop (callable): Optional function returning True if typing should stop early.
+                Only checked between keystrokes by the pynput method.
         """
-        interval = ConfigManager.get_config_value('post_processing', 'writing_key_press_delay')
+        interval = ConfigManager.snapshot().post_processing.writing_key_press_delay
         if self.input_method == 'pynput':
-            self._typewrite_pynput(text, interval)
+            self._typewrite_pynput(text, interval, should_stop)
+        elif self.input_method == 'clipboard':
+            self._paste_clipboard(text)
         elif self.input_method == 'ydotool':
-            self._typewrite_ydotool(text, interval)
+            self._typewrite_ydotool(text, interval, should_stop)
         elif self.input_method == 'dotool':
             self._typewrite_dotool(text, interval)
 
-    def _typewrite_pynput(self, text, interval):
+    def _typewrite_pynput(self, text, interval, should_stop=None):
         """
         Simulate typing using pynput.
 
         Args:
             text (str): The text to type.
             interval (float): The interval between keystrokes in seconds.
+            should_stop (callable): Optional function returning True if typing should stop early.
         """
         for char in text:
+            if should_stop and should_stop():
+                return
             self.keyboard.press(char)
             self.keyboard.release(char)
             time.sleep(interval)
 
-    def _typewrite_ydotool(self, text, interval):
+    def _paste_clipboard(self, text):
         """
-        Simulate typing using ydotool.
+        Insert text by pasting it from the clipboard, which takes the same time for any length of text.
+        The previous clipboard text is restored afterwards.
+
+        Args:
+            text (str): The text to insert.
+        """
+        import pyperclip
+
+        if not text:
+            return
+        try:
+            previous = pyperclip.paste()
+        except pyperclip.PyperclipException:
+            previous = None
+
+        pyperclip.copy(text)
+        modifier = Key.cmd if sys.platform == 'darwin' else Key.ctrl
+        with self.keyboard.pressed(modifier):
+            self.keyboard.press('v')
+            self.keyboard.release('v')
+
+        # An empty or non-text clipboard cannot be restored, so the transcription is left on it
+        if previous:
+            time.sleep(self.clipboard_restore_delay)
+            pyperclip.copy(previous)
+
+    def _typewrite_ydotool(self, text, interval, should_stop=None):
+        """
+        Simulate typing using ydotool. Key events are sent to the ydotoold socket directly; if
+        ydotoold cannot be reached, e.g. with ydotool versions before 1.0, a `ydotool type`
+        process is started instead.
 
         Args:
             text (str): The text to type.
             interval (float): The interval between keystrokes in seconds.
+            should_stop (callable): Optional function returning True if typing should stop early.
         """
+        try:
+            self.ydotool.type(text, interval, should_stop)
+            return
+        except OSError as e:
+            ConfigManager.console_print(f"Could not reach ydotoold, running ydotool instead: {e}")
+
         safe_text = sanitize_text_for_subprocess(text)
         cmd = "ydotool"
-        run_command_or_exit_on_failure([
+        run_command([
             cmd,
             "type",
             "--key-delay",
@@ -129,3 +302,5 @@ class InputSimulator:
         """
         if self.input_method == 'dotool':
             self._terminate_dotool()
+        elif self.input_method == 'ydotool':
+            self.ydotool.close()
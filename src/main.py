@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 import time
 
 
@@ -10,7 +11,9 @@ def _pre_load_model():
     ConfigManager.initialize()
     model_options = ConfigManager.get_config_section('model_options')
     model = None
-    if ConfigManager.config_file_exists() and not model_options.get('use_api'):
+    # With the inference server, the model lives in another process and never meets Qt
+    if ConfigManager.config_file_exists() and not model_options.get('use_api') \
+            and not model_options['local'].get('inference_server'):
         model = create_local_model()
     ConfigManager._instance = None
     return model
@@ -20,22 +23,34 @@ def _pre_load_model():
 # Load the model first, before any Qt imports.
 _pre_loaded_model = _pre_load_model()
 
-from audioplayer import AudioPlayer
 from pynput.keyboard import Controller
-from PyQt5.QtCore import QObject, QProcess
+from PyQt5.QtCore import QObject, QProcess, pyqtSignal
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QMessageBox
 
+from audio_capture import AudioCaptureService
+from config_watcher import ConfigWatcher
+from inference_server import RemoteWhisperModel
 from key_listener import KeyListener
+from output_worker import OutputWorker
 from result_thread import ResultThread
+from sound_player import RECORDING_START_TONES, RECORDING_STOP_TONES, SoundPlayer
 from ui.settings_window import SettingsWindow
 from ui.status_window import StatusWindow
-from transcription import create_local_model
+from transcription import (create_local_model, invalidate_api_clients, model_load_options, prewarm_api_client,
+                           refresh_api_key)
 from input_simulation import InputSimulator
 from utils import ConfigManager
 
 
+# Recording options used to open the persistent audio stream
+CAPTURE_OPTIONS = ('persistent_stream', 'sample_rate', 'sound_device', 'pre_roll_duration', 'capture_dtype')
+
+
 class WhisperWriterApp(QObject):
+    modelStatusSignal = pyqtSignal(str)
+    configFileChangedSignal = pyqtSignal()
+
     def __init__(self):
         """
         Initialize the application, opening settings window if no configuration file is found.
@@ -49,7 +64,10 @@ class WhisperWriterApp(QObject):
 
         self.settings_window = SettingsWindow()
         self.settings_window.settings_closed.connect(self.on_settings_closed)
-        self.settings_window.settings_saved.connect(self.restart_app)
+        self.settings_window.settings_saved.connect(self.on_settings_saved)
+        self.modelStatusSignal.connect(self.on_model_status)
+        self.configFileChangedSignal.connect(self.reload_config_file)
+        ConfigManager.add_listener(self.apply_config_change)
 
         self.initialize_components()
 
@@ -57,26 +75,140 @@ class WhisperWriterApp(QObject):
         """
         Initialize the components of the application.
         """
-        self.input_simulator = InputSimulator()
+        self.output_worker = OutputWorker(InputSimulator())
+        self.sound_player = self.create_sound_player()
 
         self.key_listener = KeyListener()
         self.key_listener.add_callback("on_activate", self.on_activation)
         self.key_listener.add_callback("on_deactivate", self.on_deactivation)
 
-        model_options = ConfigManager.get_config_section('model_options')
-        if not model_options.get('use_api'):
-            self.local_model = _pre_loaded_model or create_local_model()
-        else:
-            self.local_model = None
+        self.create_tray_icon()
+
+        self.model_signature = self.get_model_signature()
+        self.local_model = self.create_model(_pre_loaded_model)
 
         self.result_thread = None
+        self.capture_service = self.create_capture_service()
 
         if not ConfigManager.get_config_value('misc', 'hide_status_window'):
-            self.status_window = StatusWindow()
+            self.create_status_window()
+
+        self.config_watcher = ConfigWatcher(os.path.join('src', 'config.yaml'), self.configFileChangedSignal.emit)
+        if ConfigManager.get_config_value('misc', 'watch_config_file'):
+            self.config_watcher.start()
 
-        self.create_tray_icon()
         self.key_listener.start()
 
+    def get_model_signature(self):
+        """
+        Return the model-related configuration, used to tell whether saved settings require a new model.
+        """
+        model_options = ConfigManager.get_config_section('model_options')
+        local_model_options = model_options['local']
+        return (model_options.get('use_api'),
+                local_model_options.get('inference_server'),
+                local_model_options.get('inference_server_port'),
+                tuple(model_load_options(local_model_options).items()))
+
+    def create_model(self, pre_loaded_model=None):
+        """
+        Create the local model, or connect to the inference server that owns it.
+
+        :param pre_loaded_model: In-process model loaded before Qt was imported, if any
+        :return: model object, or None when the API is used
+        """
+        model_options = ConfigManager.get_config_section('model_options')
+        if model_options.get('use_api'):
+            return None
+
+        local_model_options = model_options['local']
+        if local_model_options.get('inference_server'):
+            model = RemoteWhisperModel(local_model_options.get('inference_server_port') or 50765)
+            self.load_remote_model(model)
+            return model
+
+        return pre_loaded_model or create_local_model()
+
+    def load_remote_model(self, model):
+        """
+        Ask the inference server to load the configured model and report progress in the tray.
+        The server keeps serving the previous model until the new one is ready.
+        """
+        local_model_options = ConfigManager.get_config_section('model_options', 'local')
+        try:
+            if not model.load(model_load_options(local_model_options)):
+                return
+        except (ConnectionError, EOFError) as e:
+            ConfigManager.console_print(f'Could not reach inference server: {e}')
+            self.modelStatusSignal.emit('error')
+            return
+
+        ConfigManager.console_print('Inference server is loading the model...')
+        self.modelStatusSignal.emit('loading')
+
+        def wait_for_model():
+            try:
+                status = model.wait_until_loaded()['status']
+            except Exception as e:
+                ConfigManager.console_print(f'Lost connection to inference server: {e}')
+                status = 'error'
+            self.modelStatusSignal.emit(status)
+
+        threading.Thread(target=wait_for_model, daemon=True).start()
+
+    def on_model_status(self, status):
+        """
+        Show the model loading status in the system tray.
+        """
+        if status == 'loading':
+            self.tray_icon.setToolTip('WhisperWriter - 모델 불러오는 중...')
+        elif status == 'ready':
+            self.tray_icon.setToolTip('WhisperWriter')
+            self.tray_icon.showMessage('WhisperWriter', '음성 인식 모델이 준비되었습니다.', QSystemTrayIcon.Information, 3000)
+        elif status == 'error':
+            self.tray_icon.setToolTip('WhisperWriter - 모델 불러오기 실패')
+            self.tray_icon.showMessage('WhisperWriter', '음성 인식 모델을 불러오지 못했습니다.', QSystemTrayIcon.Warning, 5000)
+
+    def create_capture_service(self):
+        """
+        Start the persistent audio capture service if enabled in the configuration.
+        """
+        recording_options = ConfigManager.get_config_section('recording_options')
+        if not recording_options.get('persistent_stream'):
+            return None
+
+        capture_service = AudioCaptureService(recording_options.get('sample_rate') or 16000,
+                                              device=recording_options.get('sound_device'),
+                                              pre_roll_ms=recording_options.get('pre_roll_duration') or 0,
+                                              dtype=recording_options.get('capture_dtype') or 'int16')
+        try:
+            capture_service.start()
+        except Exception as e:
+            ConfigManager.console_print(f'Could not open persistent audio stream: {e}')
+            return None
+        return capture_service
+
+    def create_sound_player(self):
+        """
+        Create the sound player with the completion sound and the recording start and stop cues
+        decoded into memory, so playing them never waits for the disk.
+        """
+        sound_player = SoundPlayer()
+        try:
+            sound_player.load('completion', os.path.join('assets', 'beep.wav'))
+        except Exception as e:
+            ConfigManager.console_print(f'Could not load the completion sound: {e}')
+        sound_player.add_tone('recording_start', RECORDING_START_TONES)
+        sound_player.add_tone('recording_stop', RECORDING_STOP_TONES)
+        return sound_player
+
+    def create_status_window(self):
+        """
+        Create the status window. Closing it cancels the output that has not been typed yet.
+        """
+        self.status_window = StatusWindow()
+        self.status_window.closeSignal.connect(self.output_worker.cancel)
+
     def create_tray_icon(self):
         """
         Create the system tray icon and its context menu.
@@ -94,27 +226,112 @@ class WhisperWriterApp(QObject):
         tray_menu.addAction(exit_action)
 
         self.tray_icon.setContextMenu(tray_menu)
+        self.tray_icon.setToolTip('WhisperWriter')
         self.tray_icon.show()
 
     def cleanup(self):
+        self.config_watcher.stop()
         if self.key_listener:
             self.key_listener.stop()
-        if self.input_simulator:
-            self.input_simulator.cleanup()
+        if self.output_worker:
+            self.output_worker.stop()
+        if self.capture_service:
+            self.capture_service.stop()
+        self.sound_player.close()
+
+    def close_model(self, shutdown_server=False):
+        """
+        Release the current model.
+
+        :param shutdown_server: Also stop the inference server, unloading its model
+        """
+        if isinstance(self.local_model, RemoteWhisperModel):
+            self.local_model.close(shutdown=shutdown_server)
+        self.local_model = None
 
     def exit_app(self):
         """
         Exit the application.
         """
         self.cleanup()
+        self.close_model(shutdown_server=True)
         QApplication.quit()
 
     def restart_app(self):
         """Restart the application to apply the new settings."""
         self.cleanup()
+        # Leave the inference server running so the restarted app finds the model already loaded
+        self.close_model()
         QApplication.quit()
         QProcess.startDetached(sys.executable, [sys.argv[0]])
 
+    def on_settings_saved(self):
+        """
+        Called when the settings have been saved. The changed options were already applied when the
+        configuration was saved; only the API key, which is kept outside of it, may still have changed.
+        """
+        refresh_api_key()
+
+    def reload_config_file(self):
+        """
+        Reload the configuration after the file was changed by another program.
+        """
+        if ConfigManager.reload_config():
+            ConfigManager.console_print('Configuration file reloaded.')
+        else:
+            ConfigManager.console_print('Could not parse the changed configuration file, keeping the current configuration.')
+
+    def apply_config_change(self, old_config, new_config):
+        """
+        Apply a changed configuration in place, touching only the subsystems whose options changed.
+        Options read for each recording, such as post-processing and decode options, need nothing
+        else. The app is only restarted when a model has to be loaded in this process, since
+        CTranslate2 cannot load a model after Qt has been initialized.
+
+        :param old_config: Configuration snapshot before the change
+        :param new_config: Configuration snapshot after the change
+        """
+        model_signature = self.get_model_signature()
+        if model_signature != self.model_signature:
+            self.stop_result_thread()
+            if not new_config.model_options.use_api and not new_config.model_options.local.inference_server:
+                self.restart_app()
+                return
+            if model_signature[:3] == self.model_signature[:3] and isinstance(self.local_model, RemoteWhisperModel):
+                # Only the model changed: the server swaps it in once loaded, without downtime
+                self.load_remote_model(self.local_model)
+            else:
+                self.close_model()
+                self.local_model = self.create_model()
+            self.model_signature = model_signature
+
+        if old_config.model_options.api != new_config.model_options.api:
+            invalidate_api_clients()
+
+        if old_config.post_processing.input_method != new_config.post_processing.input_method:
+            self.output_worker.set_input_simulator(InputSimulator())
+
+        old_recording, new_recording = old_config.recording_options, new_config.recording_options
+        if (old_recording.activation_key, old_recording.input_backend) != \
+                (new_recording.activation_key, new_recording.input_backend):
+            self.key_listener.update_activation_keys()
+            self.key_listener.update_backend()
+            # update_backend may already have started the new backend; restart it exactly once
+            self.key_listener.stop()
+            self.key_listener.start()
+        if any(getattr(old_recording, key) != getattr(new_recording, key) for key in CAPTURE_OPTIONS):
+            self.stop_result_thread()
+            if self.capture_service:
+                self.capture_service.stop()
+            self.capture_service = self.create_capture_service()
+
+        if not new_config.misc.hide_status_window and not hasattr(self, 'status_window'):
+            self.create_status_window()
+        if new_config.misc.watch_config_file:
+            self.config_watcher.start()
+        else:
+            self.config_watcher.stop()
+
     def on_settings_closed(self):
         """Called when settings window is closed without saving."""
         pass
@@ -124,20 +341,27 @@ class WhisperWriterApp(QObject):
         Called when the activation key combination is pressed.
         """
         if self.result_thread and self.result_thread.isRunning():
-            recording_mode = ConfigManager.get_config_value('recording_options', 'recording_mode')
+            recording_mode = ConfigManager.snapshot().recording_options.recording_mode
             if recording_mode == 'press_to_toggle':
                 self.result_thread.stop_recording()
             elif recording_mode == 'continuous':
+                # Stopping dictation also drops the text that is still queued to be typed
                 self.stop_result_thread()
+                self.output_worker.cancel()
             return
 
+        model_options = ConfigManager.snapshot().model_options
+        uses_api = model_options.use_api or model_options.hedged_transcription
+        if uses_api and model_options.api.prewarm_connection:
+            threading.Thread(target=prewarm_api_client, daemon=True).start()
+
         self.start_result_thread()
 
     def on_deactivation(self):
         """
         Called when the activation key combination is released.
         """
-        if ConfigManager.get_config_value('recording_options', 'recording_mode') == 'hold_to_record':
+        if ConfigManager.snapshot().recording_options.recording_mode == 'hold_to_record':
             if self.result_thread and self.result_thread.isRunning():
                 self.result_thread.stop_recording()
 
@@ -148,10 +372,13 @@ class WhisperWriterApp(QObject):
         if self.result_thread and self.result_thread.isRunning():
             return
 
-        self.result_thread = ResultThread(self.local_model)
-        if not ConfigManager.get_config_value('misc', 'hide_status_window'):
+        self.result_thread = ResultThread(self.local_model, self.capture_service)
+        if not ConfigManager.snapshot().misc.hide_status_window:
             self.result_thread.statusSignal.connect(self.status_window.updateStatus)
+            self.result_thread.partialSignal.connect(self.status_window.updatePartial)
             self.status_window.closeSignal.connect(self.stop_result_thread)
+        self.result_thread.recordingSignal.connect(self.on_recording_changed)
+        self.result_thread.segmentSignal.connect(self.on_segment_transcribed)
         self.result_thread.resultSignal.connect(self.on_transcription_complete)
         self.result_thread.start()
 
@@ -162,18 +389,36 @@ class WhisperWriterApp(QObject):
         if self.result_thread and self.result_thread.isRunning():
             self.result_thread.stop()
 
+    def on_recording_changed(self, recording):
+        """
+        Play the recording start or stop cue if enabled.
+        """
+        misc_options = ConfigManager.snapshot().misc
+        if recording and misc_options.noise_on_recording_start:
+            self.sound_player.play('recording_start')
+        elif not recording and misc_options.noise_on_recording_stop:
+            self.sound_player.play('recording_stop')
+
+    def on_segment_transcribed(self, text):
+        """
+        Type a segment of the transcription as soon as it has been decoded.
+        """
+        self.output_worker.type_text(text)
+
     def on_transcription_complete(self, result):
         """
-        When the transcription is complete, type the result and start listening for the activation key again.
+        When the transcription is complete, queue the result to be typed and start listening for the
+        activation key again without waiting for it to be typed.
         """
-        self.input_simulator.typewrite(result)
+        self.output_worker.type_text(result)
 
-        if ConfigManager.get_config_value('misc', 'noise_on_completion'):
-            AudioPlayer(os.path.join('assets', 'beep.wav')).play(block=True)
+        config = ConfigManager.snapshot()
+        if config.misc.noise_on_completion:
+            self.output_worker.play_sound(lambda: self.sound_player.play('completion'))
 
-        if ConfigManager.get_config_value('recording_options', 'recording_mode') == 'continuous':
-            self.start_result_thread()
-        else:
+        # In continuous mode the result thread keeps listening for the next utterance by itself, and a
+        # result that arrives after the activation key stopped dictation must not start it again
+        if config.recording_options.recording_mode != 'continuous':
             self.key_listener.start()
 
     def run(self):
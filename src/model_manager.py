@@ -0,0 +1,98 @@
+import gc
+import threading
+
+
+class ModelManager:
+    """
+    Owns the loaded model and replaces it without downtime.
+
+    A new model is loaded on a background thread while the current one keeps serving
+    requests. Once it is ready, it is swapped in atomically and the old model is released.
+    """
+
+    def __init__(self, loader):
+        """
+        Initialize the ModelManager.
+
+        :param loader: Function that takes model options and returns a loaded model
+        """
+        self.loader = loader
+        self.model = None
+        self.options = None
+        self.pending_options = None
+        self.status = 'empty'
+        self.error = None
+        self.lock = threading.Lock()
+        self.loaded = threading.Condition(self.lock)
+
+    def wait(self, timeout=None):
+        """
+        Wait until a model is available.
+
+        :param timeout: Maximum number of seconds to wait, or None to wait indefinitely
+        :return: the current model, or None if no model became available
+        """
+        with self.loaded:
+            self.loaded.wait_for(lambda: self.model is not None or self.status == 'error', timeout)
+            return self.model
+
+    def wait_until_settled(self, timeout=None):
+        """
+        Wait until no model load is in progress.
+
+        :param timeout: Maximum number of seconds to wait, or None to wait indefinitely
+        :return: the current status
+        """
+        with self.loaded:
+            self.loaded.wait_for(lambda: self.status != 'loading', timeout)
+            return self.status
+
+    def request(self, options):
+        """
+        Make the model for the given options the current one, loading it in the background.
+
+        :param options: Model options passed to the loader
+        :return: True if a load was started, False if that model is already loaded or loading
+        """
+        with self.lock:
+            if options == self.pending_options:
+                return False
+            if options == self.options and self.model is not None:
+                # Going back to the current model discards any load in progress
+                self.pending_options = None
+                self.status = 'ready'
+                self.loaded.notify_all()
+                return False
+            self.pending_options = options
+            self.status = 'loading'
+            self.error = None
+        threading.Thread(target=self._load, args=(options,), daemon=True).start()
+        return True
+
+    def _load(self, options):
+        """Load a model and swap it in, unless a newer request has superseded it meanwhile."""
+        try:
+            model = self.loader(options)
+        except Exception as e:
+            with self.lock:
+                if self.pending_options != options:
+                    return
+                self.pending_options = None
+                self.status = 'error'
+                self.error = f'{type(e).__name__}: {e}'
+                self.loaded.notify_all()
+            return
+
+        with self.lock:
+            if self.pending_options != options:
+                # A different model was requested while this one was loading
+                return
+            old_model, self.model = self.model, model
+            self.options = options
+            self.pending_options = None
+            self.status = 'ready'
+            self.loaded.notify_all()
+
+        # Release the old model only after the swap, so in-flight requests finish on it
+        del old_model
+        gc.collect()
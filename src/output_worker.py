@@ -0,0 +1,97 @@
+import queue
+import threading
+
+from utils import ConfigManager
+
+
+class OutputWorker:
+    """
+    Types transcriptions and plays the completion sound on a dedicated thread, so that neither
+    the Qt main thread nor the next recording waits for the output.
+
+    Tasks run one at a time, in the order they were submitted, so the segments of a transcription
+    and consecutive transcriptions are typed in the order they were produced. cancel() drops the
+    pending output and stops the text that is being typed.
+    """
+
+    def __init__(self, input_simulator):
+        """
+        Initialize the OutputWorker and start its thread.
+
+        :param input_simulator: InputSimulator used to type the text, owned by the worker from now on
+        """
+        self.input_simulator = input_simulator
+        self.tasks = queue.Queue()
+        # Output submitted before the last cancel() belongs to an older generation and is dropped
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _submit(self, function, *args, cancellable=True):
+        with self.lock:
+            self.tasks.put((self.generation if cancellable else None, function, args))
+
+    def type_text(self, text):
+        """
+        Queue text to be typed after the output submitted before it.
+
+        :param text: Text to type
+        """
+        if text:
+            self._submit(self._type_text, text)
+
+    def play_sound(self, play):
+        """
+        Queue a sound to be played after the output submitted before it.
+
+        :param play: Function that starts playing the sound
+        """
+        self._submit(self._call, play)
+
+    def set_input_simulator(self, input_simulator):
+        """
+        Type the output submitted from now on with a different InputSimulator. The current one is
+        cleaned up once the output submitted before has been typed.
+
+        :param input_simulator: New InputSimulator
+        """
+        self._submit(self._set_input_simulator, input_simulator, cancellable=False)
+
+    def cancel(self):
+        """Drop the pending output and stop typing the current text as soon as possible."""
+        with self.lock:
+            self.generation += 1
+
+    def stop(self):
+        """Cancel the pending output, stop the thread and clean up the InputSimulator."""
+        self.cancel()
+        self.tasks.put(None)
+        self.thread.join(timeout=2)
+
+    def _is_cancelled(self, generation):
+        return generation is not None and generation != self.generation
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            generation, function, args = task
+            if self._is_cancelled(generation):
+                continue
+            try:
+                function(generation, *args)
+            except Exception as e:
+                ConfigManager.console_print(f'Error while writing the output: {e}')
+        self.input_simulator.cleanup()
+
+    def _type_text(self, generation, text):
+        self.input_simulator.typewrite(text, should_stop=lambda: self._is_cancelled(generation))
+
+    def _call(self, generation, function):
+        function()
+
+    def _set_input_simulator(self, generation, input_simulator):
+        self.input_simulator.cleanup()
+        self.input_simulator = input_simulator
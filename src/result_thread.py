@@ -2,15 +2,16 @@ import time
 import logging
 import numpy as np
 import sounddevice as sd
-import tempfile
-import wave
-import webrtcvad
 from PyQt5.QtCore import QThread, QMutex, pyqtSignal
-from collections import deque
-from threading import Event
+from queue import Queue
+from threading import Event, Thread
 
-from transcription import transcribe
+from audio_capture import AudioBuffer, AudioCaptureService, Recording
+from sound_player import RECORDING_START_TONES, SoundPlayer
+from transcription import (SegmentPostProcessor, StreamingTranscriber, iter_transcribe_local,
+                           post_process_transcription, transcribe)
 from utils import ConfigManager
+from vad import create_vad
 
 logger = logging.getLogger(__name__)
 
@@ -26,25 +27,41 @@ class ResultThread(QThread):
     4. Transcribing the audio
     5. Emitting the transcription result
 
+    In continuous mode the steps run as a pipeline: the audio stream stays open and the next
+    utterance is recorded while the previous ones are transcribed by a worker thread.
+
     Signals:
         statusSignal: Emits the current status of the thread (e.g., 'recording', 'transcribing', 'idle')
-        resultSignal: Emits the transcription result
+        resultSignal: Emits the transcription result, or only its untyped remainder if the
+                      segments were already emitted through segmentSignal
+        segmentSignal: Emits post-processed text to type as soon as each segment is decoded
+        partialSignal: Emits partial transcriptions while recording (streaming mode only)
+        recordingSignal: Emits True when recording starts and False when it stops
     """
 
     statusSignal = pyqtSignal(str)
     resultSignal = pyqtSignal(str)
+    segmentSignal = pyqtSignal(str)
+    partialSignal = pyqtSignal(str)
+    recordingSignal = pyqtSignal(bool)
+
+    # Maximum number of recorded utterances waiting for transcription in continuous mode
+    max_pending_utterances = 4
 
-    def __init__(self, local_model=None):
+    def __init__(self, local_model=None, capture_service=None):
         """
         Initialize the ResultThread.
 
         :param local_model: Local transcription model (if applicable)
+        :param capture_service: Persistent AudioCaptureService to record from (if enabled)
         """
         super().__init__()
         self.local_model = local_model
+        self.capture_service = capture_service
         self.is_recording = False
         self.is_running = True
         self.sample_rate = None
+        self.audio_buffer = None
         self.mutex = QMutex()
 
     def stop_recording(self):
@@ -61,6 +78,62 @@ class ResultThread(QThread):
         self.statusSignal.emit('idle')
         self.wait()
 
+    def _create_streamer(self):
+        """Create a StreamingTranscriber if streaming transcription is enabled and possible."""
+        config = ConfigManager.snapshot()
+        if config.model_options.use_api or not self.local_model:
+            return None
+        if not config.model_options.local.streaming_transcription:
+            return None
+        sample_rate = config.recording_options.sample_rate or 16000
+        return StreamingTranscriber(self.local_model, sample_rate)
+
+    def _stream_partials(self, streamer, stop_event):
+        """
+        Periodically decode the audio recorded so far and emit partial transcriptions.
+
+        :param streamer: StreamingTranscriber fed with the current recording
+        :param stop_event: Event set when recording has finished
+        """
+        interval = (ConfigManager.snapshot().model_options.local.streaming_interval or 1000) / 1000.0
+        decoded_samples = 0
+        try:
+            while not stop_event.wait(interval):
+                audio_buffer = self.audio_buffer
+                if audio_buffer is None:
+                    continue
+                audio_data = audio_buffer.view()
+                # Wait for at least a second of audio, and for new audio since the last pass
+                if len(audio_data) < streamer.sample_rate or len(audio_data) == decoded_samples:
+                    continue
+                decoded_samples = len(audio_data)
+
+                partial = streamer.update(audio_data).strip()
+                if partial and not stop_event.is_set():
+                    self.partialSignal.emit(partial)
+        except Exception as e:
+            logger.error("Streaming transcription error: %s", type(e).__name__, exc_info=True)
+
+    def _start_streaming(self):
+        """
+        Start emitting partial transcriptions of the current recording, if enabled.
+
+        :return: (stop event, thread, streamer), with thread and streamer None when disabled
+        """
+        stream_stop = Event()
+        streamer = self._create_streamer()
+        stream_thread = None
+        if streamer:
+            stream_thread = Thread(target=self._stream_partials, args=(streamer, stream_stop), daemon=True)
+            stream_thread.start()
+        return stream_stop, stream_thread, streamer
+
+    def _stop_streaming(self, stream_stop, stream_thread):
+        """Stop emitting partial transcriptions and wait for any in-flight partial pass."""
+        stream_stop.set()
+        if stream_thread:
+            stream_thread.join()
+
     def run(self):
         """Main execution method for the thread."""
         try:
@@ -71,118 +144,352 @@ class ResultThread(QThread):
             self.is_recording = True
             self.mutex.unlock()
 
+            if ConfigManager.snapshot().recording_options.recording_mode == 'continuous':
+                self._run_continuous()
+            else:
+                self._run_single()
+
+        except Exception as e:
+            logger.error("Transcription error: %s", type(e).__name__, exc_info=True)
+            ConfigManager.console_print(f'오류가 발생했습니다: {type(e).__name__}')
+            self.statusSignal.emit('error')
+            self.resultSignal.emit('')
+        finally:
+            self.stop_recording()
+
+    def _run_single(self):
+        """Record a single utterance, then transcribe it and emit the result."""
+        stream_stop, stream_thread, streamer = self._start_streaming()
+        try:
             self.statusSignal.emit('recording')
+            self.recordingSignal.emit(True)
             ConfigManager.console_print('Recording...')
-            audio_data = self._record_audio()
+            recording = self._record_audio()
+        finally:
+            self.recordingSignal.emit(False)
+            # The final decode below reuses the model, so wait for any in-flight partial pass
+            self._stop_streaming(stream_stop, stream_thread)
 
-            if not self.is_running:
-                return
+        if not self.is_running:
+            return
 
-            if audio_data is None:
-                self.statusSignal.emit('idle')
-                return
+        if recording is None:
+            self.statusSignal.emit('idle')
+            return
 
-            self.statusSignal.emit('transcribing')
-            ConfigManager.console_print('Transcribing...')
+        result = self._transcribe(recording, streamer)
 
-            # Time the transcription process
-            start_time = time.time()
-            result = transcribe(audio_data, self.local_model)
-            end_time = time.time()
+        if not self.is_running:
+            return
 
-            transcription_time = end_time - start_time
-            ConfigManager.console_print(f'Transcription completed in {transcription_time:.2f} seconds. Post-processed line: {result}')
+        self.statusSignal.emit('idle')
+        self.resultSignal.emit(result)
 
-            if not self.is_running:
+    def _run_continuous(self):
+        """
+        Record utterances back to back without closing the audio stream, handing each one to a
+        transcription worker through a bounded queue.
+        """
+        options = self._recording_settings()
+        capture_service = self.capture_service
+        owns_capture_service = not (capture_service and capture_service.is_active())
+        if owns_capture_service:
+            capture_service = AudioCaptureService(self.sample_rate, device=options['sound_device'],
+                                                  blocksize=options['frame_size'], pre_roll_ms=0,
+                                                  dtype=options['dtype'])
+
+        audio_buffer = AudioBuffer(self.sample_rate, dtype=capture_service.dtype)
+        data_ready = Event()
+        capture_service.attach(audio_buffer, data_ready)
+        if owns_capture_service:
+            capture_service.start()
+
+        pending = Queue(maxsize=self.max_pending_utterances)
+        worker = Thread(target=self._transcription_worker, args=(pending,), daemon=True)
+        worker.start()
+
+        # Anything already in the buffer is pre-roll captured before activation
+        pre_roll_frames = len(audio_buffer) // options['frame_size']
+        skip_frames = options['initial_frames_to_skip']
+        try:
+            self.statusSignal.emit('recording')
+            self.recordingSignal.emit(True)
+            ConfigManager.console_print('Recording...')
+            while self.is_running and self.is_recording:
+                self.audio_buffer = audio_buffer
+                stream_stop, stream_thread, streamer = self._start_streaming()
+                try:
+                    recorded_samples, speech_flags = self._consume_frames(audio_buffer, data_ready, options,
+                                                                          skip_frames, pre_roll_frames)
+                finally:
+                    self._stop_streaming(stream_stop, stream_thread)
+                skip_frames = 0
+                pre_roll_frames = 0
+
+                # Keep capturing into a fresh buffer, carrying over audio recorded past the endpoint
+                next_buffer = AudioBuffer(self.sample_rate, dtype=capture_service.dtype)
+                capture_service.handover(next_buffer, recorded_samples)
+
+                recording = self._finish_recording(audio_buffer, recorded_samples, speech_flags, options)
+                if recording is not None and self.is_running:
+                    pending.put((recording, streamer))
+                audio_buffer = next_buffer
+        finally:
+            self.recordingSignal.emit(False)
+            capture_service.detach()
+            if owns_capture_service:
+                capture_service.stop()
+            pending.put(None)
+            worker.join()
+
+    def _transcription_worker(self, pending):
+        """
+        Transcribe utterances from the queue in order and emit each result.
+
+        :param pending: Queue of (Recording, streamer) tuples, terminated by None
+        """
+        while True:
+            item = pending.get()
+            if item is None:
                 return
+            if not self.is_running:
+                continue
 
-            self.statusSignal.emit('idle')
+            recording, streamer = item
+            try:
+                result = self._transcribe(recording, streamer)
+            except Exception as e:
+                logger.error("Transcription error: %s", type(e).__name__, exc_info=True)
+                ConfigManager.console_print(f'오류가 발생했습니다: {type(e).__name__}')
+                continue
+
+            if not self.is_running:
+                continue
+
+            self.statusSignal.emit('recording')
             self.resultSignal.emit(result)
 
-        except Exception as e:
-            logger.error("Transcription error: %s", type(e).__name__, exc_info=True)
-            ConfigManager.console_print(f'오류가 발생했습니다: {type(e).__name__}')
-            self.statusSignal.emit('error')
-            self.resultSignal.emit('')
-        finally:
-            self.stop_recording()
+    def _transcribe(self, recording, streamer=None):
+        """
+        Transcribe recorded audio and return the post-processed result.
 
-    def _record_audio(self):
+        :param recording: Recording to transcribe
+        :param streamer: StreamingTranscriber that already decoded part of the audio, if any
+        :return: post-processed transcription
         """
-        Record audio from the microphone and save it to a temporary file.
+        self.statusSignal.emit('transcribing')
+        ConfigManager.console_print('Transcribing...')
+
+        # Time the transcription process
+        start_time = time.time()
+        if streamer:
+            result = post_process_transcription(streamer.finish(recording.audio, recording.offset))
+            line = result
+        elif self._types_segments():
+            processor = SegmentPostProcessor()
+            for piece in iter_transcribe_local(recording.audio, self.local_model, recording.speech_flags):
+                text = processor.process(piece)
+                if text and self.is_running:
+                    self.segmentSignal.emit(text)
+            result = processor.finish()
+            line = processor.text
+        else:
+            result = transcribe(recording.audio, self.local_model, recording.speech_flags)
+            line = result
+        end_time = time.time()
+
+        transcription_time = end_time - start_time
+        ConfigManager.console_print(f'Transcription completed in {transcription_time:.2f} seconds. Post-processed line: {line}')
+        return result
+
+    def _types_segments(self):
+        """Return True if local transcription results should be emitted segment by segment."""
+        config = ConfigManager.snapshot()
+        if not config.post_processing.type_segments or not self.local_model:
+            return False
+        return not config.model_options.use_api and not config.model_options.hedged_transcription
+
+    def _recording_settings(self):
+        """
+        Read the recording options needed by the recording loop.
 
-        :return: numpy array of audio data, or None if the recording is too short
+        :return: dict of recording settings
         """
-        recording_options = ConfigManager.get_config_section('recording_options')
-        self.sample_rate = recording_options.get('sample_rate') or 16000
+        config = ConfigManager.snapshot()
+        recording_options = config.recording_options
+        self.sample_rate = recording_options.sample_rate or 16000
         frame_duration_ms = 30  # 30ms frame duration for WebRTC VAD
         frame_size = int(self.sample_rate * (frame_duration_ms / 1000.0))
-        silence_duration_ms = recording_options.get('silence_duration') or 900
-        silence_frames = int(silence_duration_ms / frame_duration_ms)
+        silence_duration_ms = recording_options.silence_duration or 900
+
+        # Create VAD only for recording modes that use it, or to find the speech to keep when trimming
+        recording_mode = recording_options.recording_mode or 'continuous'
+        endpointing = recording_mode in ('voice_activity_detection', 'continuous')
+        trim_silence = recording_options.trim_silence
+        vad = None
+        if endpointing or trim_silence:
+            vad = create_vad(self.sample_rate)
 
         # 150ms delay before starting VAD to avoid mistaking the sound of key pressing for voice
-        initial_frames_to_skip = int(0.15 * self.sample_rate / frame_size)
+        skip_seconds = 0.15
+        if config.misc.noise_on_recording_start:
+            # The start cue plays while recording and is picked up by the microphone
+            cue_seconds = len(RECORDING_START_TONES) * SoundPlayer.tone_duration + SoundPlayer.output_latency
+            skip_seconds = max(skip_seconds, cue_seconds)
+
+        return {
+            'frame_size': frame_size,
+            'silence_frames': int(silence_duration_ms / frame_duration_ms),
+            'initial_frames_to_skip': int(skip_seconds * self.sample_rate / frame_size),
+            'vad': vad,
+            'endpointing': endpointing,
+            'trim_silence': trim_silence,
+            'trim_padding_frames': int((recording_options.trim_padding or 0) / frame_duration_ms),
+            'sound_device': recording_options.sound_device,
+            'min_duration': recording_options.min_duration or 100,
+            'dtype': np.dtype(recording_options.capture_dtype or 'int16'),
+        }
 
-        # Create VAD only for recording modes that use it
-        recording_mode = recording_options.get('recording_mode') or 'continuous'
-        vad = None
-        if recording_mode in ('voice_activity_detection', 'continuous'):
-            vad = webrtcvad.Vad(2)  # VAD aggressiveness: 0 to 3, 3 being the most aggressive
-            speech_detected = False
-            silent_frame_count = 0
+    def _record_audio(self):
+        """
+        Record audio from the microphone into a preallocated buffer.
 
-        audio_buffer = deque()
-        recording = []
+        :return: Recording, or None if the recording is too short or contains no speech
+        """
+        options = self._recording_settings()
+        frame_size = options['frame_size']
 
+        use_capture_service = self.capture_service and self.capture_service.is_active()
+        dtype = self.capture_service.dtype if use_capture_service else options['dtype']
+        audio_buffer = AudioBuffer(self.sample_rate, dtype=dtype)
+        self.audio_buffer = audio_buffer
         data_ready = Event()
 
         def audio_callback(indata, frames, time, status):
             if status:
                 ConfigManager.console_print(f"Audio callback status: {status}")
-            audio_buffer.extend(indata[:, 0])
+            audio_buffer.append(indata[:, 0])
             data_ready.set()
 
-        with sd.InputStream(samplerate=self.sample_rate, channels=1, dtype='int16',
-                            blocksize=frame_size, device=recording_options.get('sound_device'),
-                            callback=audio_callback):
-            while self.is_running and self.is_recording:
-                data_ready.wait()
-                data_ready.clear()
+        if use_capture_service:
+            stream_context = self.capture_service.recording(audio_buffer, data_ready)
+        else:
+            stream_context = sd.InputStream(samplerate=self.sample_rate, channels=1, dtype=dtype.name,
+                                            blocksize=frame_size, device=options['sound_device'],
+                                            callback=audio_callback)
+
+        with stream_context:
+            # Anything already in the buffer is pre-roll captured before activation
+            pre_roll_frames = len(audio_buffer) // frame_size
+            recorded_samples, speech_flags = self._consume_frames(audio_buffer, data_ready, options,
+                                                                  options['initial_frames_to_skip'], pre_roll_frames)
+
+        return self._finish_recording(audio_buffer, recorded_samples, speech_flags, options)
 
-                if len(audio_buffer) < frame_size:
+    def _consume_frames(self, audio_buffer, data_ready, options, skip_frames, pre_roll_frames=0):
+        """
+        Feed recorded frames to the VAD until the recording is stopped or speech has ended.
+
+        :param audio_buffer: AudioBuffer being filled by the audio stream
+        :param data_ready: Event set by the audio stream when new audio is available
+        :param options: Recording settings from _recording_settings
+        :param skip_frames: Number of frames after activation to keep out of endpoint detection,
+                            such as the key press. They are recorded as non-speech, so they neither
+                            keep a recording that has no speech nor move the start of the trimmed audio.
+        :param pre_roll_frames: Number of leading frames captured before activation. They are kept
+                                out of endpoint detection, but keep their VAD decisions, so speech
+                                that started before activation is not trimmed off.
+        :return: (number of samples that belong to the utterance, per-frame VAD decisions or None)
+        """
+        frame_size = options['frame_size']
+        silence_frames = options['silence_frames']
+        vad = options['vad']
+        endpointing = options['endpointing']
+        speech_detected = False
+        silent_frame_count = 0
+        recorded_samples = 0
+        speech_flags = [] if vad else None
+
+        while self.is_running and self.is_recording:
+            data_ready.wait()
+            data_ready.clear()
+
+            # Several blocks may have arrived since the last wake-up; process all complete frames
+            frames = audio_buffer.read_frames(frame_size)
+
+            if not vad:
+                recorded_samples += len(frames) * frame_size
+                continue
+
+            for is_speech in vad.process(frames):
+                recorded_samples += frame_size
+
+                # Avoid trying to detect the end of speech in initial frames
+                if pre_roll_frames > 0:
+                    pre_roll_frames -= 1
+                    speech_flags.append(is_speech)
+                    continue
+                if skip_frames > 0:
+                    skip_frames -= 1
+                    speech_flags.append(False)
                     continue
 
-                # Save frame
-                frame = np.array(list(audio_buffer), dtype=np.int16)
-                audio_buffer.clear()
-                recording.extend(frame)
+                speech_flags.append(is_speech)
 
-                # Avoid trying to detect voice in initial frames
-                if initial_frames_to_skip > 0:
-                    initial_frames_to_skip -= 1
+                if not endpointing:
                     continue
 
-                if vad:
-                    if vad.is_speech(frame.tobytes(), self.sample_rate):
-                        silent_frame_count = 0
-                        if not speech_detected:
-                            ConfigManager.console_print("Speech detected.")
-                            speech_detected = True
-                    else:
-                        silent_frame_count += 1
+                if is_speech:
+                    silent_frame_count = 0
+                    if not speech_detected:
+                        ConfigManager.console_print("Speech detected.")
+                        speech_detected = True
+                else:
+                    silent_frame_count += 1
 
-                    if speech_detected and silent_frame_count > silence_frames:
-                        break
+                if speech_detected and silent_frame_count > silence_frames:
+                    return recorded_samples, speech_flags
 
-        audio_data = np.array(recording, dtype=np.int16)
-        duration = len(audio_data) / self.sample_rate
+        return recorded_samples, speech_flags
 
-        ConfigManager.console_print(f'Recording finished. Size: {audio_data.size} samples, Duration: {duration:.2f} seconds')
+    def _finish_recording(self, audio_buffer, recorded_samples, speech_flags, options):
+        """
+        Return the recorded utterance with leading and trailing non-speech trimmed, or None if it
+        is too short or contains no speech.
+
+        :param audio_buffer: AudioBuffer holding the recording
+        :param recorded_samples: Number of samples that belong to the utterance
+        :param speech_flags: Per-frame VAD decisions, or None if VAD did not run
+        :param options: Recording settings from _recording_settings
+        :return: Recording, or None if the recording is discarded
+        """
+        frame_size = options['frame_size']
+        start = 0
+        end = recorded_samples
+
+        if speech_flags is not None:
+            speech_flags = np.array(speech_flags, dtype=bool)
+            speech_frames = np.flatnonzero(speech_flags)
+            if len(speech_frames) == 0:
+                ConfigManager.console_print('Discarded because no speech was detected.')
+                return None
+
+            if options['trim_silence']:
+                padding = options['trim_padding_frames']
+                first_frame = max(speech_frames[0] - padding, 0)
+                last_frame = min(speech_frames[-1] + 1 + padding, len(speech_flags))
+                start = first_frame * frame_size
+                end = min(last_frame * frame_size, recorded_samples)
+                speech_flags = speech_flags[first_frame:last_frame]
+
+        audio_data = audio_buffer.view(start, end)
+        duration = len(audio_data) / self.sample_rate
+        trimmed = (recorded_samples - len(audio_data)) / self.sample_rate
 
-        min_duration_ms = recording_options.get('min_duration') or 100
+        ConfigManager.console_print(f'Recording finished. Size: {audio_data.size} samples, Duration: {duration:.2f} seconds, Trimmed: {trimmed:.2f} seconds')
 
-        if (duration * 1000) < min_duration_ms:
+        if (duration * 1000) < options['min_duration']:
             ConfigManager.console_print(f'Discarded due to being too short.')
             return None
 
-        return audio_data
+        return Recording(audio_data, start, speech_flags)
@@ -0,0 +1,101 @@
+import threading
+import numpy as np
+import sounddevice as sd
+
+from utils import ConfigManager
+
+# Frequencies in Hz of the tones of the recording start and stop cues
+RECORDING_START_TONES = (660, 880)
+RECORDING_STOP_TONES = (880, 660)
+
+
+class SoundPlayer:
+    """
+    Plays short sound cues without blocking the caller.
+
+    Sounds are decoded into memory once, when they are added, and every play opens its own
+    output stream, so playing a cue never reads from disk or waits for another cue to finish.
+    """
+
+    # Default length in seconds of each synthesized tone
+    tone_duration = 0.07
+    # Seconds a sound may take to reach the speakers after play() is called
+    output_latency = 0.1
+
+    def __init__(self):
+        """
+        Initialize the SoundPlayer.
+        """
+        self.sounds = {}
+        self.streams = []
+        self.lock = threading.Lock()
+
+    def load(self, name, path):
+        """
+        Decode a sound file into memory.
+
+        :param name: Name to play the sound by
+        :param path: Path to an audio file readable by soundfile
+        """
+        import soundfile as sf
+
+        data, sample_rate = sf.read(path, dtype='float32', always_2d=True)
+        self.sounds[name] = (data, sample_rate)
+
+    def add_tone(self, name, frequencies, duration=tone_duration, sample_rate=44100, volume=0.2):
+        """
+        Synthesize a cue made of consecutive sine tones.
+
+        :param name: Name to play the sound by
+        :param frequencies: Frequency in Hz of each tone
+        :param duration: Length in seconds of each tone
+        :param sample_rate: Sample rate of the sound in Hz
+        :param volume: Peak amplitude between 0 and 1
+        """
+        t = np.arange(int(duration * sample_rate)) / sample_rate
+        # Fade each tone in and out to avoid clicks
+        fade = np.minimum(1.0, np.minimum(t, duration - t) / 0.005)
+        tone = np.concatenate([np.sin(2 * np.pi * frequency * t) * fade for frequency in frequencies])
+        self.sounds[name] = ((tone * volume).astype(np.float32)[:, np.newaxis], sample_rate)
+
+    def play(self, name):
+        """
+        Start playing a sound and return immediately.
+
+        :param name: Name of a sound added with load or add_tone
+        """
+        if name not in self.sounds:
+            return
+        data, sample_rate = self.sounds[name]
+        position = 0
+
+        def callback(outdata, frames, time_info, status):
+            nonlocal position
+            chunk = data[position:position + frames]
+            outdata[:len(chunk)] = chunk
+            outdata[len(chunk):] = 0
+            position += frames
+            if position >= len(data):
+                raise sd.CallbackStop
+
+        try:
+            stream = sd.OutputStream(samplerate=sample_rate, channels=data.shape[1], dtype='float32',
+                                     callback=callback)
+            with self.lock:
+                self._close_finished_streams()
+                stream.start()
+                self.streams.append(stream)
+        except Exception as e:
+            ConfigManager.console_print(f'Could not play sound: {e}')
+
+    def _close_finished_streams(self):
+        for stream in [stream for stream in self.streams if not stream.active]:
+            stream.close()
+            self.streams.remove(stream)
+
+    def close(self):
+        """Stop all sounds and close their streams."""
+        with self.lock:
+            for stream in self.streams:
+                stream.close()
+            self.streams = []
@@ -1,7 +1,13 @@
 import os
 import logging
+import queue
+import threading
+import time
+from dataclasses import asdict
 from pathlib import Path
 import numpy as np
+from decode_policy import DecodePolicy
+from transcription_cache import TranscriptionCache, cache_key
 from utils import ConfigManager
 
 logger = logging.getLogger(__name__)
@@ -31,17 +37,76 @@ def validate_model_path(model_path):
     return str(path)
 
 
-def create_local_model():
+_transcription_cache = None
+
+def get_transcription_cache():
     """
-    Create a local model using the faster-whisper library.
-    Imports are deferred to avoid loading torch (~164MB) and faster_whisper until needed.
+    Return the transcription cache, or None if caching is disabled.
+    """
+    global _transcription_cache
+    misc_options = ConfigManager.snapshot().misc
+    if not misc_options.transcription_cache:
+        return None
+    max_disk_bytes = (misc_options.transcription_cache_size or 0) * 1024 * 1024
+    if _transcription_cache is None:
+        _transcription_cache = TranscriptionCache(max_disk_bytes=max_disk_bytes)
+    _transcription_cache.max_disk_bytes = max_disk_bytes
+    return _transcription_cache
+
+# Local model options that require loading a new model when they change
+MODEL_LOAD_OPTIONS = ('model', 'device', 'compute_type', 'model_path', 'num_workers', 'cpu_threads', 'cascade_model')
+
+def model_load_options(local_model_options):
+    """
+    Return the subset of the local model options that determines which model is loaded.
+
+    :param local_model_options: dict of local model options, or the model_options.local config snapshot
+    """
+    if isinstance(local_model_options, dict):
+        return {key: local_model_options.get(key) for key in MODEL_LOAD_OPTIONS}
+    return {key: getattr(local_model_options, key) for key in MODEL_LOAD_OPTIONS}
+
+def _load_whisper_model(model, model_path, device, compute_type, replica_options):
+    """
+    Load a faster-whisper model by name or from a directory, falling back to the CPU.
     """
     from faster_whisper import WhisperModel
 
+    try:
+        if model_path:
+            model_path = validate_model_path(model_path)
+            ConfigManager.console_print(f'Loading model from: {model_path}')
+            return WhisperModel(model_path,
+                                device=device,
+                                compute_type=compute_type,
+                                download_root=None,
+                                **replica_options)
+        return WhisperModel(model,
+                            device=device,
+                            compute_type=compute_type,
+                            **replica_options)
+    except Exception as e:
+        ConfigManager.console_print(f'Error initializing WhisperModel: {e}')
+        ConfigManager.console_print('Falling back to CPU.')
+        return WhisperModel(model_path or model,
+                            device='cpu',
+                            compute_type=compute_type,
+                            download_root=None if model_path else None,
+                            **replica_options)
+
+def create_local_model(local_model_options=None, background_cascade=False):
+    """
+    Create a local model using the faster-whisper library.
+    Imports are deferred to avoid loading torch (~164MB) and faster_whisper until needed.
+
+    :param local_model_options: Local model options, defaults to model_options.local from the config
+    :param background_cascade: Load the cascade model on a background thread instead of before returning.
+                               Only safe outside of the Qt process.
+    """
     ConfigManager.console_print('Creating local model...')
-    local_model_options = ConfigManager.get_config_section('model_options')['local']
+    if local_model_options is None:
+        local_model_options = model_load_options(ConfigManager.snapshot().model_options.local)
     compute_type = local_model_options['compute_type']
-    model_path = local_model_options.get('model_path')
 
     if compute_type == 'int8':
         device = 'cpu'
@@ -49,89 +114,520 @@ def create_local_model():
     else:
         device = local_model_options['device']
 
-    try:
-        if model_path:
-            model_path = validate_model_path(model_path)
-            ConfigManager.console_print(f'Loading model from: {model_path}')
-            model = WhisperModel(model_path,
-                                 device=device,
-                                 compute_type=compute_type,
-                                 download_root=None)
+    # Each worker is a model replica that can decode one chunk at a time
+    replica_options = {'num_workers': local_model_options.get('num_workers') or 1,
+                       'cpu_threads': local_model_options.get('cpu_threads') or 0}
+
+    model = _load_whisper_model(local_model_options['model'], local_model_options.get('model_path'),
+                                device, compute_type, replica_options)
+
+    cascade_model = local_model_options.get('cascade_model')
+    if cascade_model:
+        from cascade_model import CascadeModel
+
+        def load_cascade_model():
+            ConfigManager.console_print(f'Loading cascade model {cascade_model}...')
+            return _load_whisper_model(cascade_model, None, device, compute_type, replica_options)
+
+        if background_cascade:
+            model = CascadeModel(model, accurate_loader=load_cascade_model)
         else:
-            model = WhisperModel(local_model_options['model'],
-                                 device=device,
-                                 compute_type=compute_type)
-    except Exception as e:
-        ConfigManager.console_print(f'Error initializing WhisperModel: {e}')
-        ConfigManager.console_print('Falling back to CPU.')
-        model = WhisperModel(model_path or local_model_options['model'],
-                             device='cpu',
-                             compute_type=compute_type,
-                             download_root=None if model_path else None)
+            model = CascadeModel(model, load_cascade_model())
 
     ConfigManager.console_print('Local model created.')
     return model
 
-def transcribe_local(audio_data, local_model=None):
+def local_transcribe_options(initial_prompt=None, cascade=True):
     """
-    Transcribe an audio file using a local model.
+    Return the keyword arguments for WhisperModel.transcribe from the config.
+
+    :param initial_prompt: Prompt to use instead of the configured initial prompt
+    :param cascade: Include the thresholds for the cascade model, if one is configured
+    """
+    model_options = ConfigManager.snapshot().model_options
+    local_options = model_options.local
+    if initial_prompt is None:
+        initial_prompt = model_options.common.initial_prompt
+    options = {'language': model_options.common.language,
+               'initial_prompt': initial_prompt,
+               'condition_on_previous_text': local_options.condition_on_previous_text,
+               'temperature': model_options.common.temperature,
+               'vad_filter': local_options.vad_filter,
+               'beam_size': local_options.beam_size or 5}
+    if cascade and local_options.cascade_model:
+        thresholds = {'logprob': (local_options.cascade_logprob_threshold, -1.0),
+                      'no_speech': (local_options.cascade_no_speech_threshold, 0.6),
+                      'compression_ratio': (local_options.cascade_compression_ratio_threshold, 2.4)}
+        # 0 is a valid threshold, so only unset values fall back to the defaults
+        options['cascade_thresholds'] = {name: default if value is None else value
+                                         for name, (value, default) in thresholds.items()}
+    return options
+
+def to_float32(audio_data):
+    """
+    Return audio as float32 samples in [-1, 1] for the decoder.
+
+    float32 audio is returned without copying. int16 audio is converted with a single
+    allocation by scaling the converted copy in place.
+    """
+    if audio_data.dtype == np.float32:
+        return audio_data
+    audio = audio_data.astype(np.float32)
+    audio /= 32768.0
+    return audio
+
+def _iter_local_segments(local_model, audio_data, initial_prompt=None, cascade=True, options=None):
+    """
+    Run the local model on int16 or float32 audio and return an iterator over the segments as they are decoded.
+
+    :param cascade: Let a cascade model decode uncertain results again
+    :param options: Keyword arguments for WhisperModel.transcribe, defaults to the configured ones
+    """
+    # A model served by the inference server converts in its own process
+    if getattr(local_model, 'accepts_int16', False):
+        audio = audio_data
+    else:
+        audio = to_float32(audio_data)
+
+    if options is None:
+        options = local_transcribe_options(initial_prompt, cascade)
+    # The inference server can send each segment back as soon as it is decoded
+    if hasattr(local_model, 'iter_transcribe'):
+        return local_model.iter_transcribe(audio=audio, **options)
+    response = local_model.transcribe(audio=audio, **options)
+    return response[0]
+
+def _transcribe_local_segments(local_model, audio_data, initial_prompt=None, cascade=True):
+    """
+    Run the local model on int16 or float32 audio and return the list of decoded segments.
+    """
+    return list(_iter_local_segments(local_model, audio_data, initial_prompt, cascade))
+
+def decode_chunks(local_model, audio_data, chunks, max_workers, **options):
+    """
+    Decode chunks of a recording concurrently, one per model worker.
+
+    :param local_model: faster-whisper model loaded with num_workers >= max_workers
+    :param audio_data: float32 numpy array
+    :param chunks: list of (start, end) sample indices
+    :param max_workers: Number of chunks to decode at the same time
+    :param options: Keyword arguments for WhisperModel.transcribe
+    :return: iterator over the list of decoded segments of each chunk, in order, yielding each
+             chunk as soon as it and all chunks before it are decoded
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def decode(start, end):
+        segments, _ = local_model.transcribe(audio=audio_data[start:end], **options)
+        return list(segments)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(decode, start, end) for start, end in chunks]
+        for future in futures:
+            yield future.result()
+
+def iter_transcribe_local(audio_data, local_model=None, speech_flags=None):
+    """
+    Transcribe an audio file using a local model, yielding the raw text piece by piece as
+    soon as each segment is decoded. A cached transcription is yielded in one piece.
+
+    :param speech_flags: Per-frame VAD decisions for audio_data, used to find the pauses
+    """
+    cache = get_transcription_cache()
+    if cache is None:
+        yield from _iter_transcribe_local_uncached(audio_data, local_model, speech_flags)
+        return
+
+    model_options = ConfigManager.snapshot().model_options
+    key = cache_key(audio_data, {'backend': 'local',
+                                 'chunk_duration': model_options.common.chunk_duration,
+                                 'adaptive_decoding': model_options.local.adaptive_decoding,
+                                 'latency_budget': model_options.local.latency_budget,
+                                 **model_load_options(model_options.local),
+                                 **local_transcribe_options()})
+    text = cache.get(key)
+    if text is not None:
+        ConfigManager.console_print('Using cached transcription.')
+        yield text
+        return
+
+    pieces = []
+    for piece in _iter_transcribe_local_uncached(audio_data, local_model, speech_flags):
+        pieces.append(piece)
+        yield piece
+    cache.put(key, ''.join(pieces))
+
+# Measures decode speed and chooses decode options when adaptive decoding is enabled
+_decode_policy = DecodePolicy()
+
+def _decode_options(duration):
+    """
+    Return the decode options for audio of the given duration, adapted to the latency budget
+    if adaptive decoding is enabled.
+
+    :param duration: Length in seconds of the audio decoded by one model call
+    :return: (keyword arguments for WhisperModel.transcribe, model key or None if not adaptive)
+    """
+    options = local_transcribe_options()
+    config = ConfigManager.snapshot()
+    local_options = config.model_options.local
+    if not local_options.adaptive_decoding:
+        return options, None
+
+    model_key = tuple(model_load_options(local_options).values())
+    latency_budget = (local_options.latency_budget or 1500) / 1000
+    incremental = config.post_processing.type_segments
+    options = _decode_policy.choose(model_key, duration, latency_budget, options, incremental)
+    ConfigManager.console_print(f"Adaptive decoding: beam size {options['beam_size']}, "
+                                f"temperature {options['temperature']}, "
+                                f"{'without' if options['without_timestamps'] else 'with'} timestamps")
+    return options, model_key
+
+def _iter_transcribe_local_uncached(audio_data, local_model=None, speech_flags=None):
+    """
+    Transcribe an audio file using a local model, yielding the raw text of each segment.
+
+    With more than one model worker, recordings longer than chunk_duration are split at
+    pauses and the chunks are decoded in parallel.
     """
     if not local_model:
         local_model = create_local_model()
-    model_options = ConfigManager.get_config_section('model_options')
 
-    # Convert int16 to float32
-    audio_data_float = audio_data.astype(np.float32) / 32768.0
+    config = ConfigManager.snapshot()
+    sample_rate = config.recording_options.sample_rate or 16000
+    num_workers = config.model_options.local.num_workers or 1
+    if num_workers > 1:
+        from vad import split_at_pauses
+
+        chunks = split_at_pauses(audio_data, sample_rate, config.model_options.common.chunk_duration or 0,
+                                 speech_flags)
+        if len(chunks) > 1:
+            ConfigManager.console_print(f'Decoding {len(chunks)} chunks with {num_workers} model workers...')
+            # Like the API chunks, each chunk is prompted with the configured prompt only
+            options, _ = _decode_options(max(end - start for start, end in chunks) / sample_rate)
+            if hasattr(local_model, 'transcribe_chunks'):
+                chunk_segments = local_model.transcribe_chunks(audio_data, chunks, num_workers, **options)
+            else:
+                chunk_segments = decode_chunks(local_model, to_float32(audio_data), chunks, num_workers, **options)
+            separator = ''
+            for segments in chunk_segments:
+                text = ''.join([segment.text for segment in segments]).strip()
+                if text:
+                    yield separator + text
+                    separator = chunk_separator()
+            return
 
-    response = local_model.transcribe(audio=audio_data_float,
-                                      language=model_options['common']['language'],
-                                      initial_prompt=model_options['common']['initial_prompt'],
-                                      condition_on_previous_text=model_options['local']['condition_on_previous_text'],
-                                      temperature=model_options['common']['temperature'],
-                                      vad_filter=model_options['local']['vad_filter'],
-                                      beam_size=model_options['local'].get('beam_size', 5),)
-    return ''.join([segment.text for segment in list(response[0])])
+    duration = len(audio_data) / sample_rate
+    options, model_key = _decode_options(duration)
+    start_time = time.time()
+    for segment in _iter_local_segments(local_model, audio_data, options=options):
+        yield segment.text
+    if model_key is not None:
+        _decode_policy.record(model_key, options['beam_size'], duration, time.time() - start_time)
 
-def transcribe_api(audio_data):
+def transcribe_local(audio_data, local_model=None, speech_flags=None):
     """
-    Transcribe an audio file using the OpenAI API.
-    Imports deferred to avoid loading openai (~35MB) when using local model.
+    Transcribe an audio file using a local model.
     """
-    import io
-    import soundfile as sf
-    from openai import OpenAI
+    return ''.join(iter_transcribe_local(audio_data, local_model, speech_flags))
+
+class StreamingTranscriber:
+    """
+    Incrementally transcribe a recording that is still growing, using a local model.
+
+    Each update decodes the audio after the last committed point. Segments that end well
+    before the end of the audio are considered stable and committed; everything after them
+    is the unstable tail, which is re-decoded on the next update and once more at endpoint.
+    """
+
+    def __init__(self, local_model, sample_rate, stable_margin=1.0):
+        """
+        Initialize the StreamingTranscriber.
+
+        :param local_model: Loaded faster-whisper model
+        :param sample_rate: Sample rate of the audio in Hz
+        :param stable_margin: Seconds from the end of the audio within which segments are not committed
+        """
+        self.local_model = local_model
+        self.sample_rate = sample_rate
+        self.stable_margin = int(stable_margin * sample_rate)
+        self.committed_text = ''
+        self.committed_samples = 0
+
+    def _prompt(self):
+        """Build the decoder prompt from the configured prompt and the committed text."""
+        initial_prompt = ConfigManager.snapshot().model_options.common.initial_prompt
+        context = self.committed_text[-200:]
+        if initial_prompt and context:
+            return f'{initial_prompt} {context}'
+        return context or initial_prompt
+
+    def update(self, audio_data):
+        """
+        Decode the uncommitted part of the audio and commit stable segments.
+
+        :param audio_data: int16 numpy array of all audio recorded so far
+        :return: current partial transcription (committed text plus unstable tail)
+        """
+        window = audio_data[self.committed_samples:]
+        # Partial results only need to be fast, the cascade model is left for the final pass
+        segments = _transcribe_local_segments(self.local_model, window, self._prompt(), cascade=False)
+        stable_end = len(window) - self.stable_margin
 
+        tail = []
+        commit_to = 0
+        for segment in segments:
+            segment_end = int(segment.end * self.sample_rate)
+            if not tail and segment_end <= stable_end:
+                self.committed_text += segment.text
+                commit_to = segment_end
+            else:
+                tail.append(segment.text)
+        self.committed_samples += commit_to
+
+        return self.committed_text + ''.join(tail)
+
+    def finish(self, audio_data, offset=0):
+        """
+        Re-decode only the unstable tail of the final recording.
+
+        :param audio_data: int16 numpy array of the complete recording
+        :param offset: Index in the recording of the first sample of audio_data, if its start was trimmed
+        :return: full raw transcription
+        """
+        window = audio_data[max(self.committed_samples - offset, 0):]
+        if len(window) == 0:
+            return self.committed_text
+        segments = _transcribe_local_segments(self.local_model, window, self._prompt())
+        return self.committed_text + ''.join([segment.text for segment in segments])
+
+# OpenAI clients reused across requests, keyed by (base URL, API key)
+_api_clients = {}
+_api_key = None
+_api_clients_lock = threading.Lock()
+
+def _read_api_key():
+    """
+    Read the API key from the keyring, falling back to the OPENAI_API_KEY environment variable.
+    """
     import keyring
 
-    model_options = ConfigManager.get_config_section('model_options')
-    api_key = keyring.get_password('whisperwriter', 'openai_api_key') or os.getenv('OPENAI_API_KEY')
-    base_url = model_options['api']['base_url'] or 'https://api.openai.com/v1'
+    return keyring.get_password('whisperwriter', 'openai_api_key') or os.getenv('OPENAI_API_KEY') or ''
 
-    # Validate base_url uses HTTPS for remote servers
-    from urllib.parse import urlparse
-    parsed = urlparse(base_url)
-    if parsed.hostname not in ('localhost', '127.0.0.1') and parsed.scheme != 'https':
-        raise ValueError("API 서버 주소는 HTTPS만 허용됩니다.")
+def _get_api_key():
+    """
+    Look up the API key once and remember it until the clients are invalidated.
+    """
+    global _api_key
+    if _api_key is None:
+        _api_key = _read_api_key()
+    return _api_key
 
-    client = OpenAI(
-        api_key=api_key,
-        base_url=base_url,
-    )
+def get_api_client():
+    """
+    Return a cached OpenAI client for the configured base URL and API key.
+    The client keeps its HTTP connections alive between requests, so consecutive
+    transcriptions skip the TCP and TLS handshakes.
+    Imports deferred to avoid loading openai (~35MB) when using local model.
+    """
+    base_url = ConfigManager.snapshot().model_options.api.base_url or 'https://api.openai.com/v1'
+
+    with _api_clients_lock:
+        api_key = _get_api_key()
+        client = _api_clients.get((base_url, api_key))
+        if client is not None:
+            return client
+
+        import httpx
+        from openai import OpenAI
+
+        # Validate base_url uses HTTPS for remote servers
+        from urllib.parse import urlparse
+        parsed = urlparse(base_url)
+        if parsed.hostname not in ('localhost', '127.0.0.1') and parsed.scheme != 'https':
+            raise ValueError("API 서버 주소는 HTTPS만 허용됩니다.")
+
+        # Keep idle connections open well beyond httpx's 5 second default, since dictation
+        # requests are often tens of seconds apart
+        http_client = httpx.Client(limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=300),
+                                   timeout=httpx.Timeout(60.0, connect=10.0))
+        client = OpenAI(
+            api_key=api_key or None,
+            base_url=base_url,
+            http_client=http_client,
+        )
+        _api_clients[(base_url, api_key)] = client
+        return client
+
+def invalidate_api_clients():
+    """
+    Forget the cached API clients and the API key, e.g. after the API options have changed.
+    The clients are not closed, since a transcription that is still running may be using one;
+    their connections are released once the last request is done with them.
+    """
+    global _api_key
+    with _api_clients_lock:
+        _api_clients.clear()
+        _api_key = None
+
+def refresh_api_key():
+    """
+    Read the API key again, e.g. after the settings were saved, and forget the cached
+    API clients only if it changed.
+    """
+    api_key = _read_api_key()
+    with _api_clients_lock:
+        if _api_key is None or api_key == _api_key:
+            return
+    invalidate_api_clients()
+
+def prewarm_api_client():
+    """
+    Open a connection to the API server ahead of the first request, so the TCP and TLS
+    handshakes overlap with recording instead of adding to transcription latency.
+    """
+    try:
+        client = get_api_client()
+        client.with_options(max_retries=0, timeout=5.0).models.list()
+    except Exception as e:
+        # The status of the response doesn't matter, only that the connection is open
+        logger.debug("API pre-warm request failed: %s", e)
+
+# soundfile format, subtype, file name and MIME type for each upload format
+UPLOAD_FORMATS = {
+    'wav': ('WAV', 'PCM_16', 'audio.wav', 'audio/wav'),
+    'flac': ('FLAC', 'PCM_16', 'audio.flac', 'audio/flac'),
+    'ogg': ('OGG', 'VORBIS', 'audio.ogg', 'audio/ogg'),
+    'opus': ('OGG', 'OPUS', 'audio.ogg', 'audio/ogg'),
+}
+
+def encode_audio(audio_data, sample_rate, upload_format='wav'):
+    """
+    Encode audio for upload, falling back to WAV if the format can't be encoded.
+
+    :return: (file name, BytesIO with the encoded audio, MIME type)
+    """
+    import io
+    import soundfile as sf
+
+    if upload_format not in UPLOAD_FORMATS:
+        upload_format = 'wav'
+    file_format, subtype, file_name, mime_type = UPLOAD_FORMATS[upload_format]
 
     byte_io = io.BytesIO()
-    sample_rate = ConfigManager.get_config_section('recording_options').get('sample_rate') or 16000
-    sf.write(byte_io, audio_data, sample_rate, format='wav')
+    try:
+        sf.write(byte_io, audio_data, sample_rate, format=file_format, subtype=subtype)
+    except Exception as e:
+        if upload_format == 'wav':
+            raise
+        ConfigManager.console_print(f'Could not encode audio as {upload_format}, using wav instead: {e}')
+        return encode_audio(audio_data, sample_rate, 'wav')
     byte_io.seek(0)
+    return file_name, byte_io, mime_type
 
+def _transcribe_api_request(client, audio_data, sample_rate, prompt=None):
+    """
+    Send one audio file to the API and return the transcribed text.
+    """
+    model_options = ConfigManager.snapshot().model_options
+    upload_format = model_options.api.upload_format or 'wav'
+
+    encode_start = time.time()
+    file_name, byte_io, mime_type = encode_audio(audio_data, sample_rate, upload_format)
+    encode_time = time.time() - encode_start
+
+    request_start = time.time()
     response = client.audio.transcriptions.create(
-        model=model_options['api']['model'],
-        file=('audio.wav', byte_io, 'audio/wav'),
-        language=model_options['common']['language'],
-        prompt=model_options['common']['initial_prompt'],
-        temperature=model_options['common']['temperature'],
+        model=model_options.api.model,
+        file=(file_name, byte_io, mime_type),
+        language=model_options.common.language,
+        prompt=prompt,
+        temperature=model_options.common.temperature,
     )
+    request_time = time.time() - request_start
+
+    upload_size = byte_io.getbuffer().nbytes
+    ConfigManager.console_print(f'Uploaded {file_name}: {upload_size / 1024:.1f} KB '
+                                f'({audio_data.nbytes / max(upload_size, 1):.1f}x smaller than PCM), '
+                                f'encoded in {encode_time * 1000:.0f} ms, request took {request_time:.2f} seconds')
     return response.text
 
+# Languages that are written without spaces between words, so chunk transcriptions are joined directly
+UNSPACED_LANGUAGES = ('zh', 'ja', 'th', 'lo', 'my', 'km')
+
+def chunk_separator():
+    """
+    Return the text placed between the transcriptions of consecutive chunks.
+    """
+    language = ConfigManager.snapshot().model_options.common.language
+    return '' if language in UNSPACED_LANGUAGES else ' '
+
+def join_chunk_transcriptions(texts):
+    """
+    Join the transcriptions of consecutive chunks of one recording.
+    """
+    return chunk_separator().join([text.strip() for text in texts if text and text.strip()])
+
+def transcribe_api(audio_data, speech_flags=None):
+    """
+    Transcribe an audio file using the OpenAI API, or return the cached transcription.
+
+    :param audio_data: int16 numpy array
+    :param speech_flags: Per-frame VAD decisions for audio_data, used to find the pauses
+    """
+    cache = get_transcription_cache()
+    if cache is None:
+        return _transcribe_api_uncached(audio_data, speech_flags)
+
+    model_options = ConfigManager.snapshot().model_options
+    api_options = model_options.api
+    key = cache_key(audio_data, {'backend': 'api',
+                                 'base_url': api_options.base_url,
+                                 'model': api_options.model,
+                                 'upload_format': api_options.upload_format,
+                                 **asdict(model_options.common)})
+    text = cache.get(key)
+    if text is not None:
+        ConfigManager.console_print('Using cached transcription.')
+        return text
+
+    text = _transcribe_api_uncached(audio_data, speech_flags)
+    cache.put(key, text)
+    return text
+
+def _transcribe_api_uncached(audio_data, speech_flags=None):
+    """
+    Transcribe an audio file using the OpenAI API.
+
+    Recordings longer than chunk_duration are split at pauses and the chunks are sent
+    concurrently, so the latency is that of the slowest chunk rather than of the whole recording.
+
+    :param audio_data: int16 numpy array
+    :param speech_flags: Per-frame VAD decisions for audio_data, used to find the pauses
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from vad import split_at_pauses
+
+    config = ConfigManager.snapshot()
+    model_options = config.model_options
+    client = get_api_client()
+    sample_rate = config.recording_options.sample_rate or 16000
+    prompt = model_options.common.initial_prompt
+
+    chunks = split_at_pauses(audio_data, sample_rate, model_options.common.chunk_duration or 0,
+                             speech_flags)
+    if len(chunks) == 1:
+        return _transcribe_api_request(client, audio_data, sample_rate, prompt)
+
+    # The chunks are decoded at the same time, so each one is prompted with the configured
+    # prompt instead of the transcription of the chunk before it
+    max_workers = max(1, min(model_options.api.max_parallel_requests or 1, len(chunks)))
+    ConfigManager.console_print(f'Sending {len(chunks)} chunks with up to {max_workers} parallel requests...')
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_transcribe_api_request, client, audio_data[start:end], sample_rate, prompt)
+                   for start, end in chunks]
+        return join_chunk_transcriptions([future.result() for future in futures])
+
 def post_process_transcription(transcription):
     """
     Apply post-processing to the transcription.
@@ -139,27 +635,140 @@ def post_process_transcription(transcription):
     transcription = transcription.strip()
     if not transcription:
         return ''
-    post_processing = ConfigManager.get_config_section('post_processing')
-    if post_processing['remove_trailing_period'] and transcription.endswith('.'):
+    post_processing = ConfigManager.snapshot().post_processing
+    if post_processing.remove_trailing_period and transcription.endswith('.'):
         transcription = transcription[:-1]
-    if post_processing['add_trailing_space']:
+    if post_processing.add_trailing_space:
         transcription += ' '
-    if post_processing['remove_capitalization']:
+    if post_processing.remove_capitalization:
         transcription = transcription.lower()
 
     return transcription
 
-def transcribe(audio_data, local_model=None):
+class SegmentPostProcessor:
+    """
+    Apply the same post-processing as post_process_transcription to a transcription that
+    arrives in pieces, so each piece can be typed as soon as it is decoded.
+
+    Trailing whitespace, and a trailing period if it is to be removed, are held back until the
+    next piece arrives, since only then is it known whether they end the transcription.
+    """
+
+    def __init__(self):
+        """
+        Initialize the SegmentPostProcessor with the current post-processing options.
+        """
+        self.post_processing = ConfigManager.snapshot().post_processing
+        self.text = ''
+        self.pending = ''
+
+    def process(self, piece):
+        """
+        Post-process the next piece of the raw transcription.
+
+        :param piece: Raw text of the next segment
+        :return: text that can be typed now, possibly empty
+        """
+        text = self.pending + piece
+        if not self.text:
+            text = text.lstrip()
+        if self.post_processing.remove_capitalization:
+            text = text.lower()
+
+        ready = text.rstrip()
+        if self.post_processing.remove_trailing_period and ready.endswith('.'):
+            ready = ready[:-1]
+        self.pending = text[len(ready):]
+        self.text += ready
+        return ready
+
+    def finish(self):
+        """
+        Finish the transcription.
+
+        :return: text that remains to be typed after the last piece
+        """
+        self.pending = ''
+        if self.text and self.post_processing.add_trailing_space:
+            self.text += ' '
+            return ' '
+        return ''
+
+# Number of hedged transcriptions won by each backend since startup
+hedge_wins = {'local': 0, 'api': 0}
+
+def transcribe_hedged(audio_data, local_model, speech_flags=None):
+    """
+    Race the local model against the API and return the first non-empty transcription.
+
+    The local model starts immediately. The API request starts after hedge_delay, or as soon
+    as the local model fails or returns nothing, and is never sent if the local model wins
+    before that. The losing backend is not interrupted; its result is only logged.
+
+    :return: raw transcription of the winning backend
+    """
+    hedge_delay = (ConfigManager.snapshot().model_options.hedge_delay or 0) / 1000
+    results = queue.Queue()
+    start_api = threading.Event()
+    decided = threading.Event()
+    start_time = time.time()
+
+    def run(backend, function):
+        try:
+            text = function()
+            error = None
+        except Exception as e:
+            text, error = None, e
+        elapsed = time.time() - start_time
+        if decided.is_set():
+            ConfigManager.console_print(f'Hedged transcription: {backend} finished too late after {elapsed:.2f} seconds.')
+        results.put((backend, text, error, elapsed))
+
+    def run_api():
+        start_api.wait(hedge_delay)
+        if not decided.is_set():
+            run('api', lambda: transcribe_api(audio_data, speech_flags))
+
+    threading.Thread(target=run, args=('local', lambda: transcribe_local(audio_data, local_model, speech_flags)),
+                     daemon=True).start()
+    threading.Thread(target=run_api, daemon=True).start()
+
+    last_error = None
+    for _ in range(2):
+        backend, text, error, elapsed = results.get()
+        if text and text.strip():
+            decided.set()
+            start_api.set()
+            hedge_wins[backend] += 1
+            ConfigManager.console_print(f'Hedged transcription: {backend} won after {elapsed:.2f} seconds '
+                                        f"(local {hedge_wins['local']}, api {hedge_wins['api']}).")
+            return text
+        if error:
+            ConfigManager.console_print(f'Hedged transcription: {backend} failed: {error}')
+            last_error = error
+        # The other backend is now the only hope, so don't wait for the hedge delay
+        start_api.set()
+
+    if last_error:
+        raise last_error
+    return ''
+
+def transcribe(audio_data, local_model=None, speech_flags=None):
     """
     Transcribe audio date using the OpenAI API or a local model, depending on config.
+
+    :param speech_flags: Per-frame VAD decisions for audio_data, used to split long recordings at pauses
     """
     if audio_data is None:
         return ''
 
-    if ConfigManager.get_config_value('model_options', 'use_api'):
-        transcription = transcribe_api(audio_data)
+    model_options = ConfigManager.snapshot().model_options
+    if model_options.use_api:
+        transcription = transcribe_api(audio_data, speech_flags)
+    elif model_options.hedged_transcription and local_model:
+        transcription = transcribe_hedged(audio_data, local_model, speech_flags)
     else:
-        transcription = transcribe_local(audio_data, local_model)
+        transcription = transcribe_local(audio_data, local_model, speech_flags)
 
     return post_process_transcription(transcription)
 
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import stat
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils import ConfigManager
+
+CACHE_DIR = os.path.join('src', '.transcription_cache')
+
+
+def cache_key(audio_data, options):
+    """
+    Build the cache key for a transcription.
+
+    :param audio_data: numpy array of the audio that is transcribed
+    :param options: dict of everything besides the audio that affects the result, such as the
+                    model and the decode options
+    :return: hex digest identifying the transcription
+    """
+    digest = hashlib.sha256()
+    digest.update(memoryview(np.ascontiguousarray(audio_data)).cast('B'))
+    digest.update(repr(sorted(options.items())).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Two-tier cache of raw transcriptions, keyed by cache_key().
+
+    Recent results are kept in an in-memory LRU; every result is also written to a directory
+    on disk, where the least recently used files are deleted once the total size exceeds the limit.
+    """
+
+    # Number of transcriptions kept in memory
+    memory_entries = 64
+
+    def __init__(self, directory=CACHE_DIR, max_disk_bytes=50 * 1024 * 1024):
+        """
+        Initialize the TranscriptionCache.
+
+        :param directory: Directory for the on-disk tier
+        :param max_disk_bytes: Maximum total size of the files on disk
+        """
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.disk_bytes = None
+        self.directory_restricted = False
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.txt')
+
+    def get(self, key):
+        """
+        Look up a transcription.
+
+        :param key: Cache key
+        :return: the cached transcription, or None
+        """
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                text = file.read()
+            # Mark the file as recently used for eviction
+            os.utime(path)
+        except OSError:
+            return None
+
+        self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        """
+        Store a transcription in both tiers.
+
+        :param key: Cache key
+        :param text: Raw transcription
+        """
+        self._remember(key, text)
+        try:
+            # Transcriptions are what the user dictated, so only the owner may read them
+            os.makedirs(self.directory, mode=stat.S_IRWXU, exist_ok=True)
+            if not self.directory_restricted:
+                # Also restrict a directory created by an earlier version
+                os.chmod(self.directory, stat.S_IRWXU)
+                self.directory_restricted = True
+            path = self._path(key)
+            with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                                 stat.S_IRUSR | stat.S_IWUSR), 'w', encoding='utf-8') as file:
+                file.write(text)
+            with self.lock:
+                if self.disk_bytes is not None:
+                    self.disk_bytes += os.path.getsize(path)
+            self._evict()
+        except OSError as e:
+            ConfigManager.console_print(f'Could not write to the transcription cache: {e}')
+
+    def _remember(self, key, text):
+        """Add a transcription to the in-memory tier, dropping the least recently used one if full."""
+        with self.lock:
+            self.memory[key] = text
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    def _evict(self):
+        """Delete the least recently used files until the on-disk tier fits within its size limit."""
+        with self.lock:
+            if self.disk_bytes is not None and self.disk_bytes <= self.max_disk_bytes:
+                return
+
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith('.txt'):
+                    entry_stat = entry.stat()
+                    entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+            self.disk_bytes = sum(size for _, size, _ in entries)
+
+            for _, size, path in sorted(entries):
+                if self.disk_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    self.disk_bytes -= size
+                except OSError:
+                    pass
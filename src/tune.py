@@ -0,0 +1,179 @@
+"""
+Benchmark the configured local model across compute types and CPU thread counts, and save the
+fastest configuration whose transcription stays close to a float32 baseline.
+
+The benchmark needs a sample of speech, either from a file or recorded from the microphone:
+
+    python src/tune.py --clip sample.wav
+    python src/tune.py --record 10
+"""
+import gc
+import os
+import time
+
+import numpy as np
+
+from transcription import _transcribe_local_segments, create_local_model, model_load_options
+from utils import ConfigManager
+
+SAMPLE_RATE = 16000
+CPU_COMPUTE_TYPES = ('int8', 'int8_float32', 'float32')
+CUDA_COMPUTE_TYPES = ('int8_float16', 'float16', 'float32')
+
+
+def load_clip(path):
+    """
+    Load an audio file as 16 kHz mono int16 samples.
+
+    :param path: Path to an audio file readable by soundfile
+    :return: int16 numpy array
+    """
+    import soundfile as sf
+
+    audio, sample_rate = sf.read(path, dtype='float32', always_2d=True)
+    audio = audio.mean(axis=1)
+    if sample_rate != SAMPLE_RATE:
+        positions = np.arange(0, len(audio), sample_rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio)
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def record_clip(seconds):
+    """
+    Record a sample from the configured microphone.
+
+    :param seconds: Length of the recording
+    :return: int16 numpy array
+    """
+    import sounddevice as sd
+
+    device = ConfigManager.get_config_value('recording_options', 'sound_device')
+    print(f'{seconds}초 동안 평소처럼 말해 주세요...')
+    audio = sd.rec(int(seconds * SAMPLE_RATE), samplerate=SAMPLE_RATE, channels=1, dtype='int16', device=device)
+    sd.wait()
+    print('녹음이 끝났습니다.')
+    return audio[:, 0]
+
+
+def character_error_rate(reference, hypothesis):
+    """
+    Return the edit distance between two transcriptions relative to the length of the reference.
+    Spaces are ignored, since they are not meaningful for every language.
+    """
+    reference = ''.join(reference.split())
+    hypothesis = ''.join(hypothesis.split())
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_char != hyp_char)))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def thread_counts():
+    """Return the CPU thread counts to try: powers of two up to the number of cores, and the number of cores."""
+    cores = os.cpu_count() or 1
+    counts = []
+    threads = 1
+    while threads < cores:
+        counts.append(threads)
+        threads *= 2
+    counts.append(cores)
+    return counts
+
+
+def benchmark(audio, model_options, repeats):
+    """
+    Load a model with the given options and time its transcription of the clip.
+
+    :param audio: int16 numpy array
+    :param model_options: Local model options to load the model with
+    :param repeats: Number of timed runs, of which the fastest is kept
+    :return: (transcription, seconds)
+    """
+    model = create_local_model(model_options)
+    try:
+        # The first run includes one-time initialization and is not timed
+        text = ''.join([segment.text for segment in _transcribe_local_segments(model, audio, cascade=False)])
+        best = None
+        for _ in range(repeats):
+            start_time = time.time()
+            _transcribe_local_segments(model, audio, cascade=False)
+            elapsed = time.time() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        return text.strip(), best
+    finally:
+        del model
+        gc.collect()
+
+
+def tune(audio, tolerance, repeats):
+    """
+    Find the fastest compute type and thread count whose transcription is within the tolerance.
+
+    :param audio: int16 numpy array
+    :param tolerance: Maximum character error rate relative to the float32 baseline
+    :param repeats: Number of timed runs per configuration
+    :return: (compute_type, cpu_threads, seconds), or None if no configuration could be loaded
+    """
+    local_options = ConfigManager.get_config_section('model_options')['local']
+    base_options = model_load_options(local_options)
+    # Benchmark a single model; the cascade model is not involved in most transcriptions
+    base_options['cascade_model'] = None
+    base_options['num_workers'] = 1
+
+    compute_types = CUDA_COMPUTE_TYPES if local_options.get('device') == 'cuda' else CPU_COMPUTE_TYPES
+    counts = thread_counts()
+
+    print('기준 결과(float32)를 만드는 중...')
+    reference, reference_time = benchmark(audio, {**base_options, 'compute_type': 'float32',
+                                                  'cpu_threads': counts[-1]}, repeats)
+    print(f'기준: {reference_time:.2f}초, "{reference}"')
+
+    best = None
+    for compute_type in compute_types:
+        for cpu_threads in counts:
+            options = {**base_options, 'compute_type': compute_type, 'cpu_threads': cpu_threads}
+            try:
+                text, elapsed = benchmark(audio, options, repeats)
+            except Exception as e:
+                print(f'{compute_type} / {cpu_threads} 스레드: 사용할 수 없음 ({e})')
+                break
+            error_rate = character_error_rate(reference, text)
+            accepted = error_rate <= tolerance
+            print(f'{compute_type} / {cpu_threads} 스레드: {elapsed:.2f}초, 오차 {error_rate:.1%}'
+                  f'{"" if accepted else " (허용 범위 초과)"}')
+            if accepted and (best is None or elapsed < best[2]):
+                best = (compute_type, cpu_threads, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tune compute_type and cpu_threads for the local model')
+    parser.add_argument('--clip', help='Audio file with speech to benchmark with')
+    parser.add_argument('--record', type=float, default=10, help='Seconds to record if no clip is given')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help='Maximum character error rate relative to the float32 result')
+    parser.add_argument('--repeats', type=int, default=2, help='Timed runs per configuration')
+    parser.add_argument('--dry-run', action='store_true', help='Only print the result, do not save it')
+    args = parser.parse_args()
+
+    ConfigManager.initialize()
+    audio = load_clip(args.clip) if args.clip else record_clip(args.record)
+    result = tune(audio, args.tolerance, args.repeats)
+    if result is None:
+        print('허용 범위 안에 드는 설정을 찾지 못했습니다.')
+    else:
+        compute_type, cpu_threads, elapsed = result
+        print(f'가장 빠른 설정: compute_type={compute_type}, cpu_threads={cpu_threads} ({elapsed:.2f}초)')
+        if not args.dry_run:
+            ConfigManager.set_config_value(compute_type, 'model_options', 'local', 'compute_type')
+            ConfigManager.set_config_value(cpu_threads, 'model_options', 'local', 'cpu_threads')
+            ConfigManager.save_config()
+            print('설정을 저장했습니다.')
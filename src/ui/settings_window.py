@@ -18,36 +18,69 @@ KEYRING_API_KEY = 'openai_api_key'
 LABEL_MAP = {
     # model_options
     'use_api': '온라인 API 사용',
+    'hedged_transcription': 'API와 동시 변환',
+    'hedge_delay': 'API 요청 대기 시간 (ms)',
     'language': '인식 언어',
     'temperature': '결과 다양성',
     'initial_prompt': '인식 힌트 문구',
     'model': '음성 인식 모델',
     'base_url': 'API 서버 주소',
     'api_key': 'API 키',
+    'upload_format': '전송 파일 형식',
+    'prewarm_connection': '서버 미리 연결',
+    'chunk_duration': '분할 길이 (초)',
+    'max_parallel_requests': '동시 요청 수',
+    'num_workers': '모델 작업자 수',
+    'cpu_threads': '작업자당 CPU 스레드 수',
+    'cascade_model': '정밀 변환 모델',
+    'cascade_logprob_threshold': '정밀 변환 기준 (확신도)',
+    'cascade_no_speech_threshold': '정밀 변환 기준 (무음 확률)',
+    'cascade_compression_ratio_threshold': '정밀 변환 기준 (반복 비율)',
     'device': '처리 장치',
     'compute_type': '처리 방식',
     'condition_on_previous_text': '이전 결과 참고',
     'vad_filter': '무음 자동 감지',
     'beam_size': '인식 정밀도',
+    'adaptive_decoding': '자동 속도 조절',
+    'latency_budget': '목표 응답 시간 (ms)',
     'model_path': '모델 파일 위치',
+    'inference_server': '백그라운드 모델 서버',
+    'inference_server_port': '모델 서버 포트',
+    'streaming_transcription': '실시간 중간 결과',
+    'streaming_interval': '중간 결과 간격 (ms)',
     # recording_options
     'activation_key': '시작 단축키',
     'input_backend': '키 감지 방식',
     'recording_mode': '녹음 방식',
     'sound_device': '마이크 선택',
     'sample_rate': '음질 (Hz)',
+    'capture_dtype': '녹음 데이터 형식',
+    'vad_engine': '음성 감지 엔진',
+    'vad_aggressiveness': '음성 감지 민감도',
+    'vad_threshold': '음성 감지 기준값',
+    'energy_gate_threshold': '무음 판정 음량',
     'silence_duration': '말 끝난 후 대기 (ms)',
     'min_duration': '최소 녹음 길이 (ms)',
+    'trim_silence': '앞뒤 무음 잘라내기',
+    'trim_padding': '무음 잘라낼 때 여유 (ms)',
+    'persistent_stream': '마이크 항상 켜두기',
+    'pre_roll_duration': '시작 전 녹음 포함 (ms)',
     # post_processing
     'writing_key_press_delay': '타이핑 속도 (초)',
     'remove_trailing_period': '마침표 자동 제거',
     'add_trailing_space': '끝에 공백 추가',
     'remove_capitalization': '모두 소문자로',
+    'type_segments': '문장별로 바로 입력',
     'input_method': '타이핑 방식',
     # misc
     'print_to_terminal': '터미널에 로그 표시',
     'hide_status_window': '상태 표시 숨기기',
     'noise_on_completion': '완료 시 소리 알림',
+    'noise_on_recording_start': '녹음 시작 시 소리 알림',
+    'noise_on_recording_stop': '녹음 종료 시 소리 알림',
+    'transcription_cache': '변환 결과 저장',
+    'transcription_cache_size': '저장 공간 (MB)',
+    'watch_config_file': '설정 파일 변경 자동 적용',
 }
 
 # Korean tab names
@@ -61,33 +94,66 @@ TAB_NAME_MAP = {
 # Korean descriptions for settings
 DESC_MAP = {
     'use_api': '켜면 인터넷을 통해 OpenAI 서버로 음성을 보내 변환합니다. 끄면 내 컴퓨터에서 직접 변환합니다.',
+    'hedged_transcription': '내 컴퓨터에서 변환하면서 API 서버에도 음성을 보내, 먼저 나온 결과를 사용합니다. API 설정이 필요합니다.',
+    'hedge_delay': '내 컴퓨터의 변환이 이 시간(ms) 안에 끝나지 않으면 API 서버에도 요청을 보냅니다. 0이면 처음부터 함께 보냅니다.',
     'language': '어떤 언어를 인식할지 설정합니다. ko=한국어, en=영어, ja=일본어',
     'temperature': '0에 가까울수록 정확한 결과, 높을수록 다양한 결과를 냅니다. 보통 0.0이 좋습니다.',
     'initial_prompt': '음성 인식 전에 참고할 문구입니다. 특정 용어나 문맥을 미리 알려줄 수 있습니다. 보통 비워두세요.',
     'model': '음성을 텍스트로 바꾸는 AI 모델을 선택합니다.',
     'base_url': 'API 서버 주소입니다. OpenAI 기본값을 그대로 사용하세요.',
     'api_key': 'OpenAI에서 발급받은 API 키입니다. 온라인 모드 사용 시 필요합니다.',
+    'upload_format': 'API 서버로 녹음을 보낼 때의 파일 형식입니다. flac=음질 손실 없이 wav의 절반 크기, ogg/opus=훨씬 작지만 음질이 약간 떨어지며 서버가 지원해야 합니다.',
+    'prewarm_connection': '켜면 녹음을 시작할 때 미리 API 서버에 연결해 두어, 녹음이 끝난 후 결과를 더 빨리 받을 수 있습니다.',
+    'chunk_duration': '이 길이(초)보다 긴 녹음은 말이 끊긴 곳에서 나누어 동시에 변환합니다. 0이면 나누지 않습니다.',
+    'max_parallel_requests': '긴 녹음을 나눈 조각을 API 서버로 동시에 보낼 최대 개수입니다.',
+    'num_workers': '2 이상이면 긴 녹음을 말이 끊긴 곳에서 나누어 여러 조각을 동시에 변환합니다. 바꾸면 모델을 다시 불러옵니다.',
+    'cpu_threads': '각 작업자가 사용할 CPU 스레드 수입니다. 0이면 기본값을 사용합니다. 작업자 수 × 스레드 수가 CPU 코어 수를 넘지 않게 하세요.',
+    'cascade_model': '기본 모델의 결과가 불확실할 때 다시 변환할 더 큰 모델입니다 (예: seastar105/whisper-medium-komixv2). 비워두면 기본 모델만 사용합니다. 두 모델 모두 메모리에 올라갑니다.',
+    'cascade_logprob_threshold': '문장의 평균 로그 확률이 이 값보다 낮으면 정밀 변환 모델로 다시 변환합니다. 음수로 입력하며(예: -1.0), 0에 가까울수록 더 자주 다시 변환합니다.',
+    'cascade_no_speech_threshold': '문장이 무음일 확률이 이 값보다 높으면 정밀 변환 모델로 다시 변환합니다.',
+    'cascade_compression_ratio_threshold': '문장의 압축 비율이 이 값보다 높으면(같은 말이 반복되는 경우) 정밀 변환 모델로 다시 변환합니다.',
     'device': '음성 인식을 어디서 처리할지 선택합니다. cpu=일반 처리, cuda=그래픽카드, auto=자동',
     'compute_type': '처리 속도와 메모리 사이의 균형입니다. int8=가볍고 빠름, float32=정밀하지만 무거움',
     'condition_on_previous_text': '켜면 이전에 인식한 내용을 참고해서 다음 인식을 합니다. 끄는 것을 권장합니다.',
     'vad_filter': '켜면 음성이 없는 무음 구간을 자동으로 건너뜁니다.',
     'beam_size': '숫자가 클수록 정확하지만 느려집니다. 기본값 5를 권장합니다.',
+    'adaptive_decoding': '켜면 녹음 길이와 최근 변환 속도를 보고 목표 응답 시간 안에 결과가 나오도록 인식 정밀도를 자동으로 조절합니다. 짧은 명령은 빠르게, 긴 받아쓰기는 더 정밀하게 변환합니다.',
+    'latency_budget': '녹음이 끝난 후 글자가 나오기 시작할 때까지의 목표 시간(ms)입니다. 자동 속도 조절에 사용됩니다.',
     'model_path': '모델 파일이 저장된 폴더 경로입니다. 비워두면 자동으로 다운로드합니다.',
+    'inference_server': '켜면 음성 인식 모델을 별도의 백그라운드 프로그램에서 실행합니다. 설정을 바꾸거나 앱을 다시 시작해도 모델을 다시 불러오지 않아 빠릅니다.',
+    'inference_server_port': '백그라운드 모델 서버와 통신할 때 사용하는 포트 번호입니다. 다른 프로그램과 겹칠 때만 변경하세요.',
+    'streaming_transcription': '켜면 말하는 동안 중간 변환 결과를 상태 표시에 보여주고, 녹음이 끝나면 마지막 부분만 다시 변환하여 더 빨리 결과를 입력합니다.',
+    'streaming_interval': '실시간 중간 결과를 갱신하는 간격(밀리초)입니다. 짧을수록 자주 갱신되지만 CPU를 더 사용합니다.',
     'activation_key': '이 키 조합을 누르면 녹음이 시작됩니다. 예: ctrl+shift+space',
     'input_backend': '키보드 입력을 감지하는 방식입니다. auto로 두면 자동으로 선택됩니다.',
     'recording_mode': '녹음 방식을 선택합니다.\n- continuous: 계속 녹음 (단축키로 중지)\n- voice_activity_detection: 말이 끝나면 자동 중지\n- press_to_toggle: 단축키로 시작/중지\n- hold_to_record: 단축키 누르고 있는 동안만 녹음',
     'sound_device': '사용할 마이크를 선택합니다. 비워두면 기본 마이크를 사용합니다.',
     'sample_rate': '녹음 품질입니다. 16000이 기본값이며 대부분의 경우 충분합니다.',
+    'capture_dtype': 'float32로 녹음하면 내 컴퓨터에서 변환할 때 녹음 데이터를 변환하지 않고 바로 사용해, 긴 녹음의 메모리 사용량이 절반 이하로 줄어듭니다.',
+    'vad_engine': '말이 끝났는지 판단하는 방식입니다. webrtc=가볍고 빠름, silero=잡음이 많은 환경에서 더 정확함',
+    'vad_aggressiveness': 'webrtc 사용 시 잡음을 걸러내는 강도입니다. 0~3 중 선택하며 클수록 잡음을 더 많이 걸러냅니다. 기본값 2를 권장합니다.',
+    'vad_threshold': 'silero 사용 시 말소리로 판단하는 기준값(0~1)입니다. 높을수록 확실한 말소리만 인식합니다. 기본값 0.5를 권장합니다.',
+    'energy_gate_threshold': '이 값보다 작은 소리는 음성 감지 없이 바로 무음으로 처리하여 CPU 사용을 줄입니다. 0으로 설정하면 사용하지 않습니다.',
     'silence_duration': '말이 끝난 후 이 시간(밀리초)만큼 기다렸다가 녹음을 중지합니다. 1500 = 1.5초',
     'min_duration': '이 시간(밀리초)보다 짧은 녹음은 무시합니다. 실수로 눌렀을 때 방지용입니다.',
+    'trim_silence': '켜면 변환 전에 녹음 앞뒤의 무음을 잘라내어 더 빠르게 변환합니다. 말소리가 전혀 없는 녹음은 변환하지 않습니다.',
+    'trim_padding': '무음을 잘라낼 때 말소리 앞뒤로 남겨둘 시간(밀리초)입니다. 너무 작으면 첫 음절이나 끝 음절이 잘릴 수 있습니다.',
+    'persistent_stream': '켜면 대기 중에도 마이크를 열어두어 단축키를 누르는 즉시 녹음이 시작되고 첫 음절이 잘리지 않습니다.',
+    'pre_roll_duration': '단축키를 누르기 직전 이 시간(밀리초)만큼의 소리를 녹음 앞부분에 포함합니다. 마이크 항상 켜두기가 켜져 있어야 합니다.',
     'writing_key_press_delay': '변환된 텍스트를 입력할 때 글자 사이의 간격(초)입니다. 너무 빠르면 일부 프로그램에서 누락될 수 있습니다.',
     'remove_trailing_period': '켜면 변환 결과 끝의 마침표(.)를 자동으로 제거합니다.',
     'add_trailing_space': '켜면 변환 결과 끝에 공백을 추가하여 다음 단어와 자연스럽게 이어집니다.',
     'remove_capitalization': '켜면 영문을 모두 소문자로 변환합니다.',
-    'input_method': '변환된 텍스트를 입력하는 방식입니다. Windows에서는 pynput을 사용하세요.',
+    'type_segments': '켜면 내 컴퓨터에서 변환할 때 전체 변환이 끝나기를 기다리지 않고 문장이 나오는 대로 바로 입력합니다.',
+    'input_method': '변환된 텍스트를 입력하는 방식입니다. Windows에서는 pynput을 사용하세요. clipboard는 클립보드에 복사한 뒤 Ctrl+V(맥은 Cmd+V)로 한 번에 붙여넣어 긴 글도 바로 입력되며, 원래 클립보드 내용은 다시 되돌립니다.',
     'print_to_terminal': '켜면 프로그램 실행 상태와 변환 결과를 터미널 창에 표시합니다.',
     'hide_status_window': '켜면 녹음/변환 중 화면 하단에 나타나는 상태 표시를 숨깁니다.',
     'noise_on_completion': '켜면 음성 변환이 완료될 때 알림 소리를 재생합니다.',
+    'noise_on_recording_start': '켜면 녹음이 시작될 때 짧게 올라가는 소리를 재생합니다.',
+    'noise_on_recording_stop': '켜면 녹음이 끝날 때 짧게 내려가는 소리를 재생합니다.',
+    'transcription_cache': '켜면 변환 결과를 기억해 두어, 같은 녹음을 같은 설정으로 다시 변환할 때 바로 결과를 가져옵니다.',
+    'transcription_cache_size': '변환 결과를 디스크에 저장할 최대 크기(MB)입니다. 가득 차면 가장 오래 사용하지 않은 결과부터 지웁니다.',
+    'watch_config_file': '켜면 실행 중에 설정 파일(config.yaml)이 바뀌었을 때 프로그램을 다시 시작하지 않고 바로 적용합니다.',
 }
 
 
@@ -303,7 +369,7 @@ class SettingsWindow(BaseWindow):
         ConfigManager.set_config_value(None, 'model_options', 'api', 'api_key')
 
         ConfigManager.save_config()
-        QMessageBox.information(self, '설정 저장', '설정이 저장되었습니다. 앱을 재시작합니다.')
+        QMessageBox.information(self, '설정 저장', '설정이 저장되었습니다.')
         self.settings_saved.emit()
         self.hide()
 
@@ -1,7 +1,7 @@
 import sys
 import os
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QFont, QPixmap, QIcon, QColor, QPainter, QPainterPath, QBrush, QPen
+from PyQt5.QtGui import QFont, QFontMetrics, QPixmap, QIcon, QColor, QPainter, QPainterPath, QBrush, QPen
 from PyQt5.QtWidgets import QApplication, QLabel, QHBoxLayout, QGraphicsOpacityEffect, QWidget
 from PyQt5.QtCore import QRectF
 
@@ -100,6 +100,13 @@ class StatusWindow(QWidget):
         if status in ('idle', 'error', 'cancel'):
             self.close()
 
+    @pyqtSlot(str)
+    def updatePartial(self, text):
+        # Show the most recent words of the partial transcription
+        metrics = QFontMetrics(self.status_label.font())
+        self.status_label.setText(metrics.elidedText(text, Qt.ElideLeft, self.width() - 60))
+        self.status_label.setToolTip(text)
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -1,6 +1,59 @@
 import yaml
 import os
 import stat
+import threading
+from dataclasses import make_dataclass
+from typing import Optional
+
+# Python types of the setting types used in the schema
+SCHEMA_TYPES = {'bool': bool, 'str': str, 'int': int, 'float': float}
+
+
+def is_setting(item):
+    """Return True if a schema entry is a single setting rather than a section of settings."""
+    return isinstance(item, dict) and 'value' in item
+
+
+def make_snapshot_class(name, schema_section):
+    """
+    Generate a frozen, slots-based dataclass for a section of the configuration schema.
+    Nested sections become fields holding instances of their own generated class.
+
+    :param name: Class name
+    :param schema_section: dict of schema entries
+    :return: dataclass type
+    """
+    fields = []
+    for key, item in schema_section.items():
+        if is_setting(item):
+            fields.append((key, Optional[SCHEMA_TYPES.get(item.get('type'), object)]))
+        elif isinstance(item, dict):
+            class_name = name + ''.join(part.capitalize() for part in key.split('_'))
+            fields.append((key, make_snapshot_class(class_name, item)))
+    return make_dataclass(name, fields, frozen=True, slots=True)
+
+
+def build_snapshot(snapshot_class, schema_section, values):
+    """
+    Create a snapshot instance from configuration values. Keys missing from the values get
+    the schema default, and keys that are not in the schema are ignored.
+
+    :param snapshot_class: Class generated by make_snapshot_class for the schema section
+    :param schema_section: dict of schema entries
+    :param values: dict of configuration values for the section
+    :return: snapshot_class instance
+    """
+    if not isinstance(values, dict):
+        values = {}
+    kwargs = {}
+    for key, item in schema_section.items():
+        if is_setting(item):
+            kwargs[key] = values.get(key, item['value'])
+        elif isinstance(item, dict):
+            field_class = snapshot_class.__dataclass_fields__[key].type
+            kwargs[key] = build_snapshot(field_class, item, values.get(key))
+    return snapshot_class(**kwargs)
+
 
 class ConfigManager:
     _instance = None
@@ -9,6 +62,10 @@ class ConfigManager:
         """Initialize the ConfigManager instance."""
         self.config = None
         self.schema = None
+        self.snapshot_class = None
+        self.current_snapshot = None
+        self.listeners = []
+        self.publish_lock = threading.Lock()
 
     @classmethod
     def initialize(cls, schema_path=None):
@@ -18,6 +75,46 @@ class ConfigManager:
             cls._instance.schema = cls._instance.load_config_schema(schema_path)
             cls._instance.config = cls._instance.load_default_config()
             cls._instance.load_user_config()
+            cls._instance.snapshot_class = make_snapshot_class('Config', cls._instance.schema)
+            cls._instance.publish_snapshot()
+
+    @classmethod
+    def snapshot(cls):
+        """
+        Get the current configuration snapshot.
+
+        The snapshot is an immutable tree of dataclasses mirroring the schema, e.g.
+        snapshot().model_options.local.beam_size. It is replaced as a whole when the configuration
+        is saved or reloaded, so it can be read from any thread without locking, and a reference
+        kept for the duration of an operation sees one consistent configuration.
+        """
+        return cls._instance.current_snapshot
+
+    @classmethod
+    def add_listener(cls, listener):
+        """
+        Register a function called as listener(old_snapshot, new_snapshot) after each new snapshot
+        is published. It is called on the thread that saved or reloaded the configuration.
+        """
+        if cls._instance is None:
+            raise RuntimeError("ConfigManager not initialized")
+        cls._instance.listeners.append(listener)
+
+    @classmethod
+    def remove_listener(cls, listener):
+        """Unregister a function added with add_listener."""
+        if cls._instance is not None and listener in cls._instance.listeners:
+            cls._instance.listeners.remove(listener)
+
+    def publish_snapshot(self):
+        """Build a snapshot of the current configuration, swap it in and notify the listeners."""
+        with self.publish_lock:
+            old_snapshot = self.current_snapshot
+            self.current_snapshot = build_snapshot(self.snapshot_class, self.schema, self.config)
+            new_snapshot = self.current_snapshot
+        if old_snapshot is not None and new_snapshot != old_snapshot:
+            for listener in list(self.listeners):
+                listener(old_snapshot, new_snapshot)
 
     @classmethod
     def get_schema(cls):
@@ -95,8 +192,16 @@ class ConfigManager:
             config[category] = extract_value(settings)
         return config
 
-    def load_user_config(self, config_path=os.path.join('src', 'config.yaml')):
-        """Load user configuration and merge with default config."""
+    def load_user_config(self, config_path=os.path.join('src', 'config.yaml'), config=None):
+        """
+        Load user configuration and merge with default config.
+
+        :param config: Config dict to merge into, defaults to the current config
+        :return: False if the configuration file could not be parsed, otherwise True
+        """
+        if config is None:
+            config = self.config
+
         def deep_update(source, overrides):
             for key, value in overrides.items():
                 if isinstance(value, dict) and key in source:
@@ -108,9 +213,13 @@ class ConfigManager:
             try:
                 with open(config_path, 'r', encoding='utf-8') as file:
                     user_config = yaml.safe_load(file)
-                    deep_update(self.config, user_config)
+                if not isinstance(user_config, dict):
+                    raise yaml.YAMLError('The configuration file does not contain a mapping')
+                deep_update(config, user_config)
             except yaml.YAMLError:
                 print("Error in configuration file. Using default configuration.")
+                return False
+        return True
 
     @classmethod
     def save_config(cls, config_path=os.path.join('src', 'config.yaml')):
@@ -124,16 +233,24 @@ class ConfigManager:
             os.chmod(config_path, stat.S_IRUSR | stat.S_IWUSR)
         except OSError:
             pass  # Windows ACLs may not fully support this
+        cls._instance.publish_snapshot()
 
     @classmethod
     def reload_config(cls):
         """
-        Reload the configuration from the file.
+        Reload the configuration from the file. If the file cannot be parsed, e.g. because it is
+        being written, the current configuration is kept.
+
+        :return: True if the configuration was reloaded
         """
         if cls._instance is None:
             raise RuntimeError("ConfigManager not initialized")
-        cls._instance.config = cls._instance.load_default_config()
-        cls._instance.load_user_config()
+        config = cls._instance.load_default_config()
+        if not cls._instance.load_user_config(config=config):
+            return False
+        cls._instance.config = config
+        cls._instance.publish_snapshot()
+        return True
 
     @classmethod
     def config_file_exists(cls):
@@ -144,7 +261,7 @@ class ConfigManager:
     @classmethod
     def console_print(cls, message):
         """Print a message to the console if enabled in the configuration."""
-        if cls._instance and cls._instance.config['misc']['print_to_terminal']:
+        if cls._instance and cls._instance.current_snapshot.misc.print_to_terminal:
             try:
                 print(message)
             except UnicodeEncodeError:
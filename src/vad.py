@@ -0,0 +1,235 @@
+import os
+import numpy as np
+import webrtcvad
+
+from utils import ConfigManager
+
+
+def to_int16(samples):
+    """
+    Return samples as int16, converting float samples in [-1, 1]. int16 samples are returned as is.
+    """
+    if samples.dtype == np.int16:
+        return samples
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+class EnergyGate:
+    """
+    A cheap pre-gate that marks obviously silent frames so the VAD does not have to run on them.
+
+    Frames are classified in one vectorized pass from their RMS level and zero-crossing rate.
+    A frame is considered silent if its level is below the threshold, or if it is only slightly
+    louder but crosses zero so often that it is more likely background hiss than voice.
+    """
+
+    # RMS level used when no threshold is configured
+    default_threshold = 50
+    # Fraction of sign changes above which a quiet frame is treated as noise
+    noise_zero_crossing_rate = 0.6
+    # Frames louder than threshold * noise_level_factor are never gated as noise
+    noise_level_factor = 3.0
+
+    def __init__(self, threshold):
+        """
+        Initialize the EnergyGate.
+
+        :param threshold: RMS level (in 16-bit sample units) below which a frame is silent
+        """
+        self.threshold = threshold
+
+    def silent_mask(self, frames):
+        """
+        Classify a batch of frames.
+
+        :param frames: 2-D array with one frame per row
+        :return: boolean array, True for frames that are obviously silent
+        """
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        signs = np.signbit(samples)
+        zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        noise = (rms < self.threshold * self.noise_level_factor) & (zero_crossing_rate > self.noise_zero_crossing_rate)
+        return (rms < self.threshold) | noise
+
+
+class WebRtcVad:
+    """Voice activity detection using webrtcvad."""
+
+    def __init__(self, sample_rate, aggressiveness=2):
+        """
+        Initialize the WebRtcVad.
+
+        :param sample_rate: Sample rate of the audio in Hz
+        :param aggressiveness: VAD aggressiveness from 0 to 3, 3 being the most aggressive
+        """
+        self.sample_rate = sample_rate
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame):
+        """Return True if the int16 frame contains speech."""
+        return self.vad.is_speech(frame.tobytes(), self.sample_rate)
+
+
+class SileroVad:
+    """
+    Voice activity detection using the Silero VAD model bundled with faster-whisper, run on the
+    CPU with onnxruntime.
+
+    The model works on fixed windows of 512 samples (256 at 8 kHz), so incoming frames are
+    accumulated and the most recent speech probability is used for each frame.
+    """
+
+    def __init__(self, sample_rate, threshold=0.5, model_path=None):
+        """
+        Initialize the SileroVad.
+
+        :param sample_rate: Sample rate of the audio in Hz, 8000 or 16000
+        :param threshold: Speech probability above which a frame is speech
+        :param model_path: Path to the Silero VAD ONNX model, defaults to the one shipped with faster-whisper
+        """
+        import onnxruntime
+
+        if sample_rate not in (8000, 16000):
+            raise ValueError(f"Silero VAD는 8000Hz 또는 16000Hz만 지원합니다: {sample_rate}")
+
+        if not model_path:
+            from faster_whisper.utils import get_assets_path
+            model_path = os.path.join(get_assets_path(), 'silero_vad.onnx')
+
+        opts = onnxruntime.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = 1
+        opts.log_severity_level = 4
+        self.session = onnxruntime.InferenceSession(model_path, providers=['CPUExecutionProvider'],
+                                                    sess_options=opts)
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.window_size = 512 if sample_rate == 16000 else 256
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.probability = 0.0
+        self.h = np.zeros((2, 1, 64), dtype=np.float32)
+        self.c = np.zeros((2, 1, 64), dtype=np.float32)
+
+    def is_speech(self, frame):
+        """Return True if the int16 frame contains speech."""
+        self.pending = np.concatenate((self.pending, frame.astype(np.float32) / 32768.0))
+        while len(self.pending) >= self.window_size:
+            window = self.pending[:self.window_size].reshape(1, -1)
+            self.pending = self.pending[self.window_size:]
+            output, self.h, self.c = self.session.run(None, {
+                'input': window,
+                'h': self.h,
+                'c': self.c,
+                'sr': np.array(self.sample_rate, dtype=np.int64),
+            })
+            self.probability = float(output[0][0])
+        return self.probability >= self.threshold
+
+
+class VoiceActivityDetector:
+    """
+    Classifies recorded frames as speech or non-speech, running the configured VAD backend only
+    on frames that pass the energy pre-gate.
+    """
+
+    def __init__(self, backend, gate=None):
+        """
+        Initialize the VoiceActivityDetector.
+
+        :param backend: VAD backend with an is_speech(frame) method
+        :param gate: Optional EnergyGate used to skip obviously silent frames
+        """
+        self.backend = backend
+        self.gate = gate
+
+    def process(self, frames):
+        """
+        Classify a batch of frames.
+
+        :param frames: 2-D int16 or float32 array with one frame per row
+        :return: list of booleans, True for frames that contain speech
+        """
+        if len(frames) == 0:
+            return []
+        # The energy gate and webrtcvad work on int16; converting only the new frames keeps a
+        # float32 recording from ever being copied as a whole
+        frames = to_int16(frames)
+        if self.gate:
+            silent = self.gate.silent_mask(frames)
+        else:
+            silent = np.zeros(len(frames), dtype=bool)
+        return [not is_silent and self.backend.is_speech(frame) for frame, is_silent in zip(frames, silent)]
+
+
+def create_vad(sample_rate):
+    """
+    Create a VoiceActivityDetector from the recording options in the configuration.
+
+    :param sample_rate: Sample rate of the audio in Hz
+    :return: VoiceActivityDetector
+    """
+    recording_options = ConfigManager.snapshot().recording_options
+    engine = recording_options.vad_engine or 'webrtc'
+
+    backend = None
+    if engine == 'silero':
+        try:
+            backend = SileroVad(sample_rate, threshold=recording_options.vad_threshold or 0.5)
+        except Exception as e:
+            ConfigManager.console_print(f'Could not load Silero VAD, falling back to WebRTC VAD: {e}')
+    if backend is None:
+        aggressiveness = recording_options.vad_aggressiveness
+        backend = WebRtcVad(sample_rate, 2 if aggressiveness is None else aggressiveness)
+
+    threshold = recording_options.energy_gate_threshold
+    gate = EnergyGate(threshold) if threshold else None
+    return VoiceActivityDetector(backend, gate)
+
+
+def split_at_pauses(audio_data, sample_rate, max_chunk_duration, speech_flags=None, frame_duration_ms=30):
+    """
+    Split audio into chunks no longer than max_chunk_duration, cutting in the middle of the
+    longest pause near the end of each chunk.
+
+    :param audio_data: numpy array of audio samples
+    :param sample_rate: Sample rate of the audio in Hz
+    :param max_chunk_duration: Maximum chunk length in seconds
+    :param speech_flags: Per-frame VAD decisions for audio_data; estimated from the signal
+                         level with an EnergyGate if not given
+    :param frame_duration_ms: Duration of each VAD frame in milliseconds
+    :return: list of (start, end) sample indices covering the whole audio
+    """
+    frame_size = int(sample_rate * frame_duration_ms / 1000)
+    max_chunk_frames = int(max_chunk_duration * 1000 / frame_duration_ms)
+    frame_count = len(audio_data) // frame_size
+    if max_chunk_frames <= 0 or frame_count <= max_chunk_frames:
+        return [(0, len(audio_data))]
+
+    if speech_flags is None:
+        frames = to_int16(audio_data[:frame_count * frame_size]).reshape(frame_count, frame_size)
+        speech_flags = ~EnergyGate(EnergyGate.default_threshold).silent_mask(frames)
+    speech_flags = np.asarray(speech_flags, dtype=bool)
+
+    # Only look for pauses in the second half of each chunk, so chunks don't get too short
+    min_chunk_frames = max_chunk_frames // 2
+    bounds = []
+    start = 0
+    while frame_count - start > max_chunk_frames:
+        cut = start + max_chunk_frames
+        best_length = 0
+        run_start = None
+        for index in range(start + min_chunk_frames, start + max_chunk_frames + 1):
+            is_pause = index < len(speech_flags) and not speech_flags[index]
+            if is_pause and run_start is None:
+                run_start = index
+            if run_start is not None and (not is_pause or index == start + max_chunk_frames):
+                run_end = index if not is_pause else index + 1
+                if run_end - run_start > best_length:
+                    best_length = run_end - run_start
+                    cut = (run_start + run_end) // 2
+                run_start = None
+        bounds.append((start * frame_size, cut * frame_size))
+        start = cut
+    bounds.append((start * frame_size, len(audio_data)))
+    return bounds